@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from utils.database import get_database, init_database
+from utils.analyzer_pool import warm_up_analyzer_pool
 from datetime import datetime
 import os
 
@@ -16,6 +17,9 @@ st.set_page_config(
 # Initialize database
 init_database()
 
+# Load the pose and face models once per process
+warm_up_analyzer_pool()
+
 def main():
     st.title("🏅 Sports Authority of India")
     st.subheader("AI-Powered Athletic Talent Assessment Platform")
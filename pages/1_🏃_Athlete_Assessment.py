@@ -5,14 +5,21 @@ import tempfile
 import os
 from datetime import datetime
 import uuid
-from utils.video_analysis import VideoAnalyzer
+from utils.analysis_session import get_analysis_session
 from utils.fitness_tests import FitnessTestProcessor
 from utils.scoring import PerformanceScorer
 from utils.cheat_detection import CheatDetector
 from utils.database import get_database, save_assessment, save_athlete
+from utils.video_probe import probe_video
+from utils.video_proxy import create_proxy_video, remove_proxy_videos
+from utils.test_specs import TEST_SPECS
+from utils.analyzer_pool import warm_up_analyzer_pool
 
 st.set_page_config(page_title="Athlete Assessment", page_icon="🏃", layout="wide")
 
+# No-op once the pool is warm; covers opening this page directly
+warm_up_analyzer_pool()
+
 def main():
     st.title("🏃‍♂️ Athletic Performance Assessment")
     st.markdown("Upload your fitness test video and get instant AI-powered analysis!")
@@ -33,13 +40,7 @@ def main():
     col1, col2 = st.columns([1, 2])
     
     with col1:
-        test_type = st.selectbox("Choose Test Type", [
-            "Vertical Jump",
-            "Sit-ups (1 minute)",
-            "50m Sprint",
-            "Push-ups",
-            "Flexibility Test"
-        ])
+        test_type = st.selectbox("Choose Test Type", list(TEST_SPECS.keys()))
     
     with col2:
         # Test instructions
@@ -93,35 +94,55 @@ def main():
     )
     
     if uploaded_video and athlete_name:
-        # Save uploaded video temporarily
-        tfile = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
-        tfile.write(uploaded_video.read())
-        video_path = tfile.name
+        # Save uploaded video temporarily, with its analysis proxy
+        video_path = store_upload(uploaded_video)
         
         # Display video
         st.video(uploaded_video)
         
         # Analysis button
         if st.button("🤖 Analyze Performance", type="primary"):
+            # Pre-flight check: reject unusable clips before any pose inference
+            probe = probe_video(video_path, test_type)
+            for warning in probe['warnings']:
+                st.warning(f"⚠️ {warning}")
+            
+            if not probe['passed']:
+                for error in probe['errors']:
+                    st.error(f"❌ {error}")
+                st.info("Please re-record your video following the test instructions.")
+                discard_upload()
+                return
+            
             with st.spinner("🔍 Analyzing your performance..."):
                 try:
-                    # Initialize processors
-                    analyzer = VideoAnalyzer()
+                    # Initialize processors (video analyzers come from the warm shared pool)
                     test_processor = FitnessTestProcessor()
                     scorer = PerformanceScorer()
                     cheat_detector = CheatDetector()
                     
-                    # Step 1: Basic video analysis
+                    # Step 1: Basic video analysis (decoded once, shared by all steps)
                     st.write("🔄 Step 1: Processing video...")
-                    video_data = analyzer.analyze_video(video_path)
+                    session = get_analysis_session(video_path, test_type=test_type)
+                    
+                    # Render live progress while frames are processed
+                    progress_bar = st.progress(0.0)
+                    live_status = st.empty()
+                    for update in session.stream():
+                        if update['type'] == 'progress':
+                            progress_bar.progress(update['progress'])
+                            live_status.write(format_live_progress(update))
+                    
+                    progress_bar.progress(1.0)
+                    live_status.empty()
                     
                     # Step 2: Test-specific analysis
                     st.write("🔄 Step 2: Analyzing movement patterns...")
-                    test_results = test_processor.process_test(video_path, test_type)
+                    test_results = test_processor.process_test(video_path, test_type, session=session)
                     
                     # Step 3: Cheat detection
                     st.write("🔄 Step 3: Verifying authenticity...")
-                    cheat_analysis = cheat_detector.detect_anomalies(video_path, test_type)
+                    cheat_analysis = cheat_detector.detect_anomalies(video_path, test_type, session=session)
                     
                     # Step 4: Scoring
                     st.write("🔄 Step 4: Calculating performance score...")
@@ -136,9 +157,8 @@ def main():
                     st.info("Please ensure your video is clear and follows the test instructions.")
                 
                 finally:
-                    # Clean up temporary file
-                    if os.path.exists(video_path):
-                        os.unlink(video_path)
+                    # Clean up temporary file and its analysis proxy
+                    discard_upload()
     
     elif uploaded_video and not athlete_name:
         st.warning("⚠️ Please enter your name in the sidebar to proceed with analysis.")
@@ -305,6 +325,52 @@ def display_results(test_results, performance_score, cheat_analysis,
     for rec in recommendations:
         st.write(f"- {rec}")
 
+def store_upload(uploaded_video):
+    """
+    Save an upload once per browser session and build its analysis proxy
+    
+    The proxy is transcoded while the athlete reviews the clip, so pressing
+    Analyze streams from the proxy instead of waiting for the transcode.
+    """
+    upload_key = (uploaded_video.name, uploaded_video.size)
+    video_path = st.session_state.get('upload_path')
+    if st.session_state.get('upload_key') == upload_key and video_path and os.path.exists(video_path):
+        return video_path
+    
+    discard_upload()
+    tfile = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
+    tfile.write(uploaded_video.read())
+    tfile.close()
+    
+    with st.spinner("📼 Preparing video..."):
+        create_proxy_video(tfile.name)
+    
+    st.session_state['upload_key'] = upload_key
+    st.session_state['upload_path'] = tfile.name
+    return tfile.name
+
+def discard_upload():
+    """Delete the stored upload and its analysis proxy"""
+    video_path = st.session_state.pop('upload_path', None)
+    st.session_state.pop('upload_key', None)
+    if video_path:
+        if os.path.exists(video_path):
+            os.unlink(video_path)
+        remove_proxy_videos(video_path)
+
+def format_live_progress(update):
+    """Format a live analysis update for display"""
+    status = f"Frames analyzed: {update['frames_done']}"
+    if update['total_frames'] > 0:
+        status += f" / {update['total_frames']}"
+    
+    if 'rep_count' in update:
+        status += f" · Reps so far: {update['rep_count']}"
+    if 'hip_height' in update:
+        status += f" · Hip height: {update['hip_height']:.2f}"
+    
+    return status
+
 def get_performance_grade(score):
     """Convert numeric score to letter grade"""
     if score >= 90:
@@ -0,0 +1,140 @@
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from utils.analyzer_pool import get_analyzer_pool
+from utils.landmark_cache import compute_video_hash
+from utils.video_analysis import VideoAnalyzer
+
+class AnalysisSession:
+    """Decode-once analysis of a single video shared by every consumer of the upload"""
+    
+    def __init__(self, video_path: str, video_hash: Optional[str] = None,
+                 video_analyzer: Optional[VideoAnalyzer] = None,
+                 test_type: Optional[str] = None):
+        self.video_path = video_path
+        self.video_hash = video_hash or compute_video_hash(video_path)
+        self.test_type = test_type
+        
+        # Without a dedicated analyzer, one is checked out of the process-wide pool per use
+        self.video_analyzer = video_analyzer
+        self.lock = threading.Lock()
+        
+        # Progress of the running analysis, published to every consumer of the session
+        self._progress = threading.Condition()
+        self._updates = []
+        self._worker = None
+        self._error = None
+        
+        self._analysis = None
+        self._movement_metrics = {}
+    
+    @property
+    def analysis(self) -> Dict:
+        """Full video analysis, computed on first access and reused afterwards"""
+        for update in self.stream():
+            pass
+        return update['analysis']
+    
+    def stream(self) -> Iterator[Dict]:
+        """
+        Progress updates of the shared analysis, ending with the result
+        
+        Yields the items of ``VideoAnalyzer.analyze_video_stream``; once the
+        analysis exists only the final ``{'type': 'result'}`` item is yielded.
+        The analysis runs on a worker thread, so a slow or abandoned consumer
+        never holds the session or its analyzer.
+        """
+        with self._progress:
+            if self._analysis is None and self._worker is None:
+                self._updates = []
+                self._error = None
+                self._worker = threading.Thread(target=self._run_analysis, daemon=True)
+                self._worker.start()
+        
+        seen = 0
+        while True:
+            with self._progress:
+                self._progress.wait_for(lambda: len(self._updates) > seen or self._worker is None)
+                pending = self._updates[seen:]
+                seen += len(pending)
+                finished = self._worker is None
+            
+            # Yield outside the lock; other consumers keep receiving updates meanwhile
+            for update in pending:
+                yield update
+            if finished:
+                break
+        
+        if self._analysis is None:
+            raise self._error or RuntimeError(f"Analysis of {self.video_path} did not finish")
+        yield {'type': 'result', 'analysis': self._analysis}
+    
+    def movement_metrics(self, test_type: str) -> Dict:
+        """Test-specific movement metrics derived from the shared analysis"""
+        analysis = self.analysis
+        
+        # Pure NumPy over the stored landmarks, so no analyzer is checked out
+        with self.lock:
+            if test_type not in self._movement_metrics:
+                self._movement_metrics[test_type] = VideoAnalyzer.compute_movement_metrics(
+                    analysis, test_type
+                )
+            return self._movement_metrics[test_type]
+    
+    def _run_analysis(self):
+        """Run the analysis with a checked-out analyzer and publish its updates"""
+        error = None
+        try:
+            with self._checkout_analyzer() as analyzer:
+                for update in analyzer.analyze_video_stream(
+                    self.video_path, self.test_type, self.video_hash
+                ):
+                    with self._progress:
+                        if update['type'] == 'result':
+                            self._analysis = update['analysis']
+                        else:
+                            self._updates.append(update)
+                        self._progress.notify_all()
+        except Exception as e:
+            error = e
+        finally:
+            with self._progress:
+                self._error = error
+                self._worker = None
+                self._progress.notify_all()
+    
+    @contextmanager
+    def _checkout_analyzer(self) -> Iterator[VideoAnalyzer]:
+        """The session's own analyzer, or a pooled one for the duration of the block"""
+        if self.video_analyzer is not None:
+            yield self.video_analyzer
+        else:
+            with get_analyzer_pool().analyzer() as analyzer:
+                yield analyzer
+
+# Sessions of recent uploads, keyed by video content hash and test type
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+MAX_CACHED_SESSIONS = 8
+
+def get_analysis_session(video_path: str,
+                         video_analyzer: Optional[VideoAnalyzer] = None,
+                         test_type: Optional[str] = None) -> AnalysisSession:
+    """Get the shared analysis session for a video, creating it if needed"""
+    video_hash = compute_video_hash(video_path)
+    session_key = (video_hash, test_type)
+    
+    with _sessions_lock:
+        session = _sessions.get(session_key)
+        if session is None:
+            session = AnalysisSession(video_path, video_hash, video_analyzer, test_type)
+            _sessions[session_key] = session
+            while len(_sessions) > MAX_CACHED_SESSIONS:
+                _sessions.popitem(last=False)
+        else:
+            # Same content may arrive under a new temporary path
+            session.video_path = video_path
+            _sessions.move_to_end(session_key)
+    
+    return session
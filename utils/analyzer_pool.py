@@ -0,0 +1,93 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from utils.video_analysis import VideoAnalyzer
+
+# Analyzers kept per process; each holds its own Pose and FaceDetection graphs
+ANALYZER_POOL_SIZE = 2
+
+# Interactive uploads usually run one at a time, so spare cores run the face and
+# quality stages of each frame alongside pose, and clips long enough for several
+# min_segment_seconds segments are split across one process per pair of cores
+POOLED_ANALYZER_CONFIG = {'stage_workers': 2 if (os.cpu_count() or 1) > 2 else 0,
+                          'segment_workers': max((os.cpu_count() or 1) // 2, 1)}
+
+class AnalyzerPool:
+    """Bounded, thread-safe pool of pre-initialised VideoAnalyzer instances"""
+    
+    def __init__(self, size: int = ANALYZER_POOL_SIZE, analyzer_config: Optional[Dict] = None):
+        self.size = size
+        self.analyzer_config = analyzer_config or {}
+        
+        # LIFO keeps the most recently used analyzers in rotation
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._created = 0
+        self._lock = threading.Lock()
+    
+    def warm_up(self):
+        """Create all analyzers up front so model loading stays off the request path"""
+        while self._reserve_slot():
+            self._idle.put_nowait(self._create())
+    
+    def acquire(self, timeout: Optional[float] = None) -> VideoAnalyzer:
+        """Check out an analyzer, creating one if the pool is not full yet"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        if self._reserve_slot():
+            return self._create()
+        
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("No video analyzer became available")
+    
+    def release(self, analyzer: VideoAnalyzer):
+        """Return an analyzer to the pool"""
+        # Pose tracking must not carry over into the next video
+        analyzer.pose.reset()
+        self._idle.put_nowait(analyzer)
+    
+    @contextmanager
+    def analyzer(self, timeout: Optional[float] = None) -> Iterator[VideoAnalyzer]:
+        """Context manager that checks an analyzer out and returns it afterwards"""
+        analyzer = self.acquire(timeout)
+        try:
+            yield analyzer
+        finally:
+            self.release(analyzer)
+    
+    def _reserve_slot(self) -> bool:
+        with self._lock:
+            if self._created >= self.size:
+                return False
+            self._created += 1
+            return True
+    
+    def _create(self) -> VideoAnalyzer:
+        try:
+            return VideoAnalyzer(**self.analyzer_config)
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+# Global pool instance
+_analyzer_pool = None
+_analyzer_pool_lock = threading.Lock()
+
+def get_analyzer_pool() -> AnalyzerPool:
+    """Get the process-wide analyzer pool"""
+    global _analyzer_pool
+    with _analyzer_pool_lock:
+        if _analyzer_pool is None:
+            _analyzer_pool = AnalyzerPool(analyzer_config=POOLED_ANALYZER_CONFIG)
+        return _analyzer_pool
+
+def warm_up_analyzer_pool():
+    """Load all pooled analyzers; call once at process start"""
+    get_analyzer_pool().warm_up()
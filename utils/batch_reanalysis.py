@@ -0,0 +1,211 @@
+"""
+Batch re-analysis of stored assessment videos.
+
+Walks a directory of videos, runs each one through the same pre-flight probe,
+FitnessTestProcessor.process_test and CheatDetector.detect_anomalies used by the
+assessment page, and appends one JSON line per video to a manifest. Videos already
+in the manifest are skipped, so an interrupted run resumes where it stopped.
+
+Each video is transcoded into its analysis proxy when a worker picks it up, and the
+proxy is deleted once the video is done.
+
+The test type comes from --test-type, or else from the name of a parent directory
+(e.g. videos/Push-ups/athlete_42.mp4).
+
+With --stage-processes each worker runs decode, pose and quality/face as separate
+processes, and each manifest line records the per-stage throughput of its video.
+
+Usage:
+    python -m utils.batch_reanalysis camp_videos --manifest reanalysis.jsonl --workers 8
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+import numpy as np
+from utils.analysis_session import AnalysisSession
+from utils.cheat_detection import CheatDetector
+from utils.fitness_tests import FitnessTestProcessor
+from utils.test_specs import TEST_SPECS
+from utils.video_analysis import VideoAnalyzer, ANALYZER_PROFILES
+from utils.video_probe import probe_video
+from utils.video_proxy import remove_proxy_videos
+
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov', '.mkv'}
+
+# Videos queued per worker; keeps the pending set small on very large directories
+QUEUED_PER_WORKER = 4
+
+# Per-process processors used by batch workers
+_test_processor = None
+_cheat_detector = None
+
+def _init_batch_worker(analyzer_config: Dict):
+    """Build the worker's analyzer and processors once per process"""
+    global _test_processor, _cheat_detector
+    analyzer = VideoAnalyzer(**analyzer_config)
+    _test_processor = FitnessTestProcessor(analyzer)
+    _cheat_detector = CheatDetector(analyzer)
+
+def _reanalyze_video(video_path: str, test_type: str) -> Dict:
+    """Probe, score and verify one video in a worker process"""
+    start_time = time.perf_counter()
+    record = {'video_path': video_path, 'test_type': test_type}
+    
+    try:
+        probe = probe_video(video_path, test_type)
+        if not probe['passed']:
+            record.update({'status': 'rejected', 'errors': probe['errors']})
+        else:
+            # Ingest the video: its analysis proxy is written once, before analysis reads it
+            _test_processor.video_analyzer.create_proxy(video_path)
+            session = AnalysisSession(video_path, video_analyzer=_test_processor.video_analyzer,
+                                      test_type=test_type)
+            record.update({
+                'status': 'ok',
+                'test_results': _test_processor.process_test(video_path, test_type, session=session),
+                'cheat_analysis': _cheat_detector.detect_anomalies(video_path, test_type, session=session)
+            })
+            # Per-stage frames per second when the analyzer runs stage processes
+            if _test_processor.video_analyzer.stage_throughput:
+                record['stage_throughput'] = _test_processor.video_analyzer.stage_throughput
+    except Exception as e:
+        record.update({'status': 'error', 'error': str(e)})
+    finally:
+        # Proxies only live while their video is analysed; re-analysing a large video
+        # store would otherwise leave one proxy per video behind
+        remove_proxy_videos(video_path)
+    
+    record['seconds'] = time.perf_counter() - start_time
+    return record
+
+def find_videos(root: str, test_type: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+    """Yield (video_path, test_type) for every video under ``root`` in a stable order"""
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories.sort()
+        
+        video_test_type = test_type or _test_type_from_path(directory, root)
+        if video_test_type is None:
+            continue
+        
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS:
+                yield os.path.join(directory, name), video_test_type
+
+def _test_type_from_path(directory: str, root: str) -> Optional[str]:
+    """Nearest directory name between ``root`` and ``directory`` that is a known test type"""
+    relative = os.path.relpath(directory, root)
+    for part in reversed(relative.split(os.sep)):
+        if part in TEST_SPECS:
+            return part
+    return None
+
+def load_manifest(manifest_path: str, retry_failed: bool = False) -> Set[str]:
+    """Video paths already recorded in the manifest"""
+    done = set()
+    if not os.path.exists(manifest_path):
+        return done
+    
+    with open(manifest_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Partial line from an interrupted write
+                continue
+            if record.get('status') == 'error' and retry_failed:
+                continue
+            done.add(record['video_path'])
+    
+    return done
+
+def run_batch(videos: List[Tuple[str, str]], manifest_path: str, workers: int,
+              analyzer_config: Optional[Dict] = None) -> Dict:
+    """
+    Re-analyse videos over a process pool, appending each result to the manifest
+    
+    Returns:
+        Counts per status and throughput in videos per hour
+    """
+    summary = {'ok': 0, 'rejected': 0, 'error': 0}
+    start_time = time.perf_counter()
+    
+    # Spawned workers avoid inheriting MediaPipe graph state through fork
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_batch_worker,
+        initargs=({**(analyzer_config or {}), 'segment_workers': 1},)
+    ) as pool, open(manifest_path, 'a') as manifest:
+        pending = set()
+        queue = iter(videos)
+        finished = 0
+        
+        while True:
+            while len(pending) < workers * QUEUED_PER_WORKER:
+                video = next(queue, None)
+                if video is None:
+                    break
+                pending.add(pool.submit(_reanalyze_video, *video))
+            
+            if not pending:
+                break
+            
+            completed, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in completed:
+                record = future.result()
+                manifest.write(json.dumps(record, default=_json_default) + '\n')
+                manifest.flush()
+                
+                summary[record['status']] += 1
+                finished += 1
+                
+                elapsed = time.perf_counter() - start_time
+                print(f"[{finished}/{len(videos)}] {record['status']:<8} {record['video_path']} "
+                      f"({finished / elapsed * 3600:.0f} videos/hour)")
+    
+    elapsed = time.perf_counter() - start_time
+    summary['seconds'] = elapsed
+    summary['videos_per_hour'] = len(videos) / elapsed * 3600 if elapsed > 0 and videos else 0
+    return summary
+
+def _json_default(value):
+    """Convert NumPy values left in the results"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run test scoring and cheat detection over stored videos")
+    parser.add_argument('video_dir', help="Directory of videos, searched recursively")
+    parser.add_argument('--manifest', required=True, help="JSON-lines results file; existing entries are skipped")
+    parser.add_argument('--test-type', choices=list(TEST_SPECS.keys()),
+                        help="Test type of every video (default: taken from the parent directory name)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument('--profile', choices=list(ANALYZER_PROFILES.keys()),
+                        help="Analyzer profile (default: standard analyzer settings)")
+    parser.add_argument('--stage-processes', action='store_true',
+                        help="Run decode, pose and quality/face as separate processes in each worker")
+    parser.add_argument('--retry-failed', action='store_true', help="Re-run videos recorded with an error")
+    args = parser.parse_args()
+    
+    done = load_manifest(args.manifest, args.retry_failed)
+    videos = [video for video in find_videos(args.video_dir, args.test_type) if video[0] not in done]
+    print(f"{len(videos)} videos to analyse ({len(done)} already in the manifest)")
+    
+    analyzer_config = dict(ANALYZER_PROFILES[args.profile]) if args.profile else {}
+    if args.stage_processes:
+        analyzer_config['stage_processes'] = True
+    
+    summary = run_batch(videos, args.manifest, args.workers, analyzer_config)
+    print(f"Done: {summary['ok']} ok, {summary['rejected']} rejected, {summary['error']} failed "
+          f"in {summary['seconds']:.0f}s ({summary['videos_per_hour']:.0f} videos/hour)")
+
+if __name__ == "__main__":
+    main()
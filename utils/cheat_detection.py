@@ -2,13 +2,16 @@ import cv2
 import numpy as np
 from typing import Dict, List, Tuple, Optional
 import logging
-from utils.video_analysis import VideoAnalyzer
+from utils.video_analysis import VideoAnalyzer, get_signal_bank
+from utils.analysis_session import AnalysisSession, get_analysis_session
+from utils.test_specs import get_test_spec
 
 class CheatDetector:
     """Advanced cheat detection for fitness assessment videos"""
     
-    def __init__(self):
-        self.video_analyzer = VideoAnalyzer()
+    def __init__(self, video_analyzer: Optional[VideoAnalyzer] = None):
+        # Dedicated analyzer; None uses the shared pool of warm analyzers
+        self.video_analyzer = video_analyzer
         
         # Detection thresholds and parameters
         self.detection_params = {
@@ -30,20 +33,25 @@ class CheatDetector:
             'environmental_factors': 0.15
         }
     
-    def detect_anomalies(self, video_path: str, test_type: str) -> Dict:
+    def detect_anomalies(self, video_path: str, test_type: str,
+                         session: Optional[AnalysisSession] = None) -> Dict:
         """
         Comprehensive anomaly detection for video authenticity
         
         Args:
             video_path: Path to the video file
             test_type: Type of fitness test being performed
+            session: Shared analysis session for the video (looked up by content hash if omitted)
             
         Returns:
             Dictionary containing anomaly analysis results
         """
         try:
-            # Perform basic video analysis
-            video_analysis = self.video_analyzer.analyze_video(video_path)
+            if session is None:
+                session = get_analysis_session(video_path, self.video_analyzer, test_type)
+            
+            # Reuse the basic video analysis shared with the test processor
+            video_analysis = session.analysis
             
             # Initialize anomaly detection results
             anomaly_results = {
@@ -126,9 +134,9 @@ class CheatDetector:
             risk_factors.append(0.1)
         
         # Frame quality consistency
-        frame_qualities = analysis.get('frame_quality_scores', [])
-        if frame_qualities:
-            quality_variance = np.var(frame_qualities)
+        quality_stats = analysis.get('frame_quality_stats', {})
+        if quality_stats.get('count'):
+            quality_variance = quality_stats['variance']
             if quality_variance > 0.1:  # High variance in quality
                 checks['frame_consistency'] = {'passed': False, 'status': 'Inconsistent quality'}
                 risk_factors.append(0.2)
@@ -158,8 +166,8 @@ class CheatDetector:
         
         # Motion intensity analysis
         motion_intensity = analysis.get('motion_intensity', [])
-        if motion_intensity:
-            max_motion = max(motion_intensity)
+        if len(motion_intensity):
+            max_motion = np.max(motion_intensity)
             motion_variance = np.var(motion_intensity)
             
             # Check for unrealistic motion spikes
@@ -179,9 +187,9 @@ class CheatDetector:
             risk_factors.append(test_specific_risk)
         
         # Pose landmark consistency
-        pose_detections = analysis.get('pose_detections', [])
-        if pose_detections:
-            consistency_score = self._calculate_pose_consistency(pose_detections)
+        landmarks = analysis.get('landmarks')
+        if landmarks is not None and len(landmarks):
+            consistency_score = self._calculate_pose_consistency(landmarks)
             if consistency_score < 0.7:
                 checks['performance_outliers'] = {'passed': False, 'status': 'Inconsistent pose data'}
                 risk_factors.append(0.2)
@@ -213,7 +221,10 @@ class CheatDetector:
                 checks['frame_rate_consistency'] = {'passed': False, 'status': 'Frame timing issues'}
                 risk_factors.append(0.3)
         
-        # Motion continuity check
+        # Motion continuity check. With the two-pass event search the series mixes
+        # resolutions: steps inside analysis['event_windows'] are measured frame to
+        # frame, steps outside are spread evenly over coarse sampling gaps, so a change
+        # at a window edge is not necessarily an edit
         motion_intensity = analysis.get('motion_intensity', [])
         if len(motion_intensity) > 10:
             # Check for abrupt changes that might indicate editing
@@ -225,7 +236,7 @@ class CheatDetector:
                 risk_factors.append(0.25)
         
         # Speed variation analysis
-        if motion_intensity:
+        if len(motion_intensity):
             speed_variance = np.var(motion_intensity)
             if speed_variance > 0.5:  # High variance might indicate speed manipulation
                 checks['speed_variations'] = {'passed': False, 'status': 'Unusual speed patterns'}
@@ -253,24 +264,16 @@ class CheatDetector:
             checks['detection_rate'] = {'passed': False, 'status': 'Low detection rate'}
             risk_factors.append(0.3)
         
-        # Landmark quality analysis
-        pose_detections = analysis.get('pose_detections', [])
-        if pose_detections:
-            # Analyze landmark visibility scores
-            visibility_scores = []
-            for detection in pose_detections:
-                for landmark_name, landmark_data in detection.items():
-                    if isinstance(landmark_data, dict) and 'visibility' in landmark_data:
-                        visibility_scores.append(landmark_data['visibility'])
-            
-            if visibility_scores:
-                avg_visibility = np.mean(visibility_scores)
-                if avg_visibility < 0.6:
-                    checks['visibility_scores'] = {'passed': False, 'status': 'Poor landmark visibility'}
-                    risk_factors.append(0.2)
+        # Landmark visibility over every detected pose
+        visibility_stats = analysis.get('visibility_stats', {})
+        if visibility_stats.get('count'):
+            avg_visibility = visibility_stats['mean']
+            if avg_visibility < 0.6:
+                checks['visibility_scores'] = {'passed': False, 'status': 'Poor landmark visibility'}
+                risk_factors.append(0.2)
         
         # Anatomical consistency check
-        anatomical_consistency = self._check_anatomical_consistency(pose_detections)
+        anatomical_consistency = self._check_anatomical_consistency(analysis)
         if anatomical_consistency < 0.8:
             checks['anatomical_consistency'] = {'passed': False, 'status': 'Anatomically inconsistent'}
             risk_factors.append(0.25)
@@ -292,18 +295,18 @@ class CheatDetector:
         risk_factors = []
         
         # Frame quality as proxy for lighting consistency
-        frame_qualities = analysis.get('frame_quality_scores', [])
-        if frame_qualities:
-            quality_std = np.std(frame_qualities)
+        quality_stats = analysis.get('frame_quality_stats', {})
+        if quality_stats.get('count'):
+            quality_std = quality_stats['std']
             if quality_std > 0.2:  # High variation in frame quality
                 checks['lighting_consistency'] = {'passed': False, 'status': 'Variable lighting'}
                 risk_factors.append(0.15)
         
         # Camera stability (using motion data as proxy)
         motion_intensity = analysis.get('motion_intensity', [])
-        if motion_intensity:
+        if len(motion_intensity):
             # Check for consistent high motion that might indicate camera shake
-            high_motion_frames = sum(1 for m in motion_intensity if m > 0.3)
+            high_motion_frames = np.count_nonzero(np.asarray(motion_intensity) > 0.3)
             if high_motion_frames > len(motion_intensity) * 0.8:
                 checks['camera_movement'] = {'passed': False, 'status': 'Excessive camera movement'}
                 risk_factors.append(0.1)
@@ -320,126 +323,92 @@ class CheatDetector:
     
     def _check_test_specific_movements(self, analysis: Dict, test_type: str) -> float:
         """Check for test-specific movement anomalies"""
-        risk_score = 0.0
+        spec = get_test_spec(test_type)
+        if spec is None:
+            return 0.0
         
         key_movements = analysis.get('key_movements', [])
         motion_intensity = analysis.get('motion_intensity', [])
         
-        if test_type == "Vertical Jump":
-            # Should have clear takeoff and landing phases
-            if len(key_movements) < 1:
-                risk_score += 0.3  # No clear jump phases detected
-            
-            # Check for reasonable motion pattern
-            if motion_intensity:
-                max_motion = max(motion_intensity)
-                if max_motion < 0.1:  # Very low motion for a jump
-                    risk_score += 0.2
+        risk_score = getattr(self, f"_check_{spec['handler']}_movements")(key_movements, motion_intensity)
+        return min(risk_score, 1.0)
+    
+    def _check_vertical_jump_movements(self, key_movements: List[Dict], motion_intensity: np.ndarray) -> float:
+        """Vertical jump: should have clear takeoff and landing phases"""
+        risk_score = 0.0
+        if len(key_movements) < 1:
+            risk_score += 0.3  # No clear jump phases detected
         
-        elif test_type == "Sit-ups (1 minute)":
-            # Should have repetitive motion pattern
-            if motion_intensity:
-                # Look for periodicity in motion
-                motion_fft = np.fft.fft(motion_intensity)
-                if len(motion_fft) > 10:
-                    dominant_freq = np.argmax(np.abs(motion_fft[1:10])) + 1
-                    if dominant_freq < 1:  # No clear repetitive pattern
-                        risk_score += 0.2
-        
-        elif test_type == "50m Sprint":
-            # Should have sustained forward motion
-            if motion_intensity:
-                if np.mean(motion_intensity) < 0.05:  # Very low average motion
-                    risk_score += 0.3
-        
-        elif test_type == "Push-ups":
-            # Should have up-down repetitive motion
-            if len(key_movements) < 2:  # Should have multiple movement phases
+        # Check for reasonable motion pattern
+        if len(motion_intensity):
+            max_motion = np.max(motion_intensity)
+            if max_motion < 0.1:  # Very low motion for a jump
                 risk_score += 0.2
         
-        elif test_type == "Flexibility Test":
-            # Should have gradual reaching motion
-            if motion_intensity:
-                motion_variance = np.var(motion_intensity)
-                if motion_variance > 0.1:  # Too much variation for flexibility test
-                    risk_score += 0.15
+        return risk_score
+    
+    def _check_situps_movements(self, key_movements: List[Dict], motion_intensity: np.ndarray) -> float:
+        """Sit-ups: should have repetitive motion pattern"""
+        risk_score = 0.0
+        if len(motion_intensity):
+            # Look for periodicity in motion
+            motion_fft = np.fft.fft(motion_intensity)
+            if len(motion_fft) > 10:
+                dominant_freq = np.argmax(np.abs(motion_fft[1:10])) + 1
+                if dominant_freq < 1:  # No clear repetitive pattern
+                    risk_score += 0.2
         
-        return min(risk_score, 1.0)
+        return risk_score
+    
+    def _check_sprint_movements(self, key_movements: List[Dict], motion_intensity: np.ndarray) -> float:
+        """Sprint: should have sustained forward motion"""
+        if len(motion_intensity) and np.mean(motion_intensity) < 0.05:  # Very low average motion
+            return 0.3
+        return 0.0
+    
+    def _check_pushups_movements(self, key_movements: List[Dict], motion_intensity: np.ndarray) -> float:
+        """Push-ups: should have up-down repetitive motion"""
+        if len(key_movements) < 2:  # Should have multiple movement phases
+            return 0.2
+        return 0.0
+    
+    def _check_flexibility_movements(self, key_movements: List[Dict], motion_intensity: np.ndarray) -> float:
+        """Flexibility test: should have gradual reaching motion"""
+        if len(motion_intensity) and np.var(motion_intensity) > 0.1:  # Too much variation for flexibility test
+            return 0.15
+        return 0.0
     
-    def _calculate_pose_consistency(self, pose_detections: List[Dict]) -> float:
+    def _calculate_pose_consistency(self, landmarks: np.ndarray) -> float:
         """Calculate consistency of pose landmarks across frames"""
-        if len(pose_detections) < 10:
+        if len(landmarks) < 10:
             return 0.5
         
-        # Track key landmarks across frames
-        landmark_trajectories = {}
-        
-        for detection in pose_detections:
-            for landmark_name, landmark_data in detection.items():
-                if isinstance(landmark_data, dict) and 'x' in landmark_data:
-                    if landmark_name not in landmark_trajectories:
-                        landmark_trajectories[landmark_name] = {'x': [], 'y': [], 'z': []}
-                    
-                    landmark_trajectories[landmark_name]['x'].append(landmark_data['x'])
-                    landmark_trajectories[landmark_name]['y'].append(landmark_data['y'])
-                    landmark_trajectories[landmark_name]['z'].append(landmark_data.get('z', 0))
-        
-        # Calculate smoothness of trajectories
-        consistency_scores = []
-        
-        for landmark_name, trajectory in landmark_trajectories.items():
-            if len(trajectory['x']) > 5:
-                # Calculate smoothness using variance of derivatives
-                x_smooth = 1.0 - min(np.var(np.diff(trajectory['x'])), 0.5) * 2
-                y_smooth = 1.0 - min(np.var(np.diff(trajectory['y'])), 0.5) * 2
-                
-                landmark_consistency = (x_smooth + y_smooth) / 2
-                consistency_scores.append(landmark_consistency)
-        
-        return np.mean(consistency_scores) if consistency_scores else 0.5
+        # Smoothness of each landmark trajectory from the variance of its frame-to-frame steps
+        step_variance = np.var(np.diff(landmarks[:, :, :2], axis=0), axis=0)
+        smoothness = 1.0 - np.minimum(step_variance, 0.5) * 2
+        
+        # Average the x and y smoothness per landmark, then across landmarks
+        return float(np.mean(smoothness.mean(axis=1)))
     
-    def _check_anatomical_consistency(self, pose_detections: List[Dict]) -> float:
+    def _check_anatomical_consistency(self, analysis: Dict) -> float:
         """Check for anatomically consistent pose relationships"""
-        if not pose_detections:
+        landmarks = analysis.get('landmarks')
+        if landmarks is None or not len(landmarks):
             return 0.5
         
-        consistency_scores = []
+        signals = get_signal_bank(analysis)
         
-        for detection in pose_detections:
-            frame_consistency = []
-            
-            # Check shoulder-hip alignment
-            if all(point in detection for point in ['left_shoulder', 'right_shoulder', 'left_hip', 'right_hip']):
-                shoulder_width = abs(detection['left_shoulder']['x'] - detection['right_shoulder']['x'])
-                hip_width = abs(detection['left_hip']['x'] - detection['right_hip']['x'])
-                
-                # Shoulders should generally be wider than hips
-                if shoulder_width > hip_width * 0.8:
-                    frame_consistency.append(1.0)
-                else:
-                    frame_consistency.append(0.5)
-            
-            # Check arm proportions
-            if all(point in detection for point in ['left_shoulder', 'left_elbow', 'left_wrist']):
-                upper_arm = np.sqrt(
-                    (detection['left_shoulder']['x'] - detection['left_elbow']['x'])**2 +
-                    (detection['left_shoulder']['y'] - detection['left_elbow']['y'])**2
-                )
-                forearm = np.sqrt(
-                    (detection['left_elbow']['x'] - detection['left_wrist']['x'])**2 +
-                    (detection['left_elbow']['y'] - detection['left_wrist']['y'])**2
-                )
-                
-                # Upper arm and forearm should be similar lengths (within reason)
-                if 0.5 < upper_arm / forearm < 2.0:
-                    frame_consistency.append(1.0)
-                else:
-                    frame_consistency.append(0.3)
-            
-            if frame_consistency:
-                consistency_scores.append(np.mean(frame_consistency))
+        # Shoulders should generally be wider than hips
+        shoulder_scores = np.where(signals['shoulder_width'] > signals['hip_width'] * 0.8, 1.0, 0.5)
+        
+        # Upper arm and forearm should be similar lengths (within reason)
+        upper_arm = signals['upper_arm_length']
+        forearm = signals['forearm_length']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            arm_ratio = upper_arm / forearm
+        arm_scores = np.where((arm_ratio > 0.5) & (arm_ratio < 2.0), 1.0, 0.3)
         
-        return np.mean(consistency_scores) if consistency_scores else 0.5
+        return float(np.mean((shoulder_scores + arm_scores) / 2))
     
     def _calculate_detection_confidence(self, anomaly_results: Dict) -> float:
         """Calculate confidence in the anomaly detection"""
@@ -1,13 +1,16 @@
 import numpy as np
 from typing import Dict, List, Tuple, Optional
-from utils.video_analysis import VideoAnalyzer
+from utils.video_analysis import VideoAnalyzer, get_signal_bank
+from utils.analysis_session import AnalysisSession, get_analysis_session
+from utils.test_specs import get_test_spec
 import logging
 
 class FitnessTestProcessor:
     """Process fitness test videos and extract performance metrics"""
     
-    def __init__(self):
-        self.video_analyzer = VideoAnalyzer()
+    def __init__(self, video_analyzer: Optional[VideoAnalyzer] = None):
+        # Dedicated analyzer; None uses the shared pool of warm analyzers
+        self.video_analyzer = video_analyzer
         
         # Test-specific thresholds and parameters
         self.test_parameters = {
@@ -38,26 +41,23 @@ class FitnessTestProcessor:
             }
         }
     
-    def process_test(self, video_path: str, test_type: str) -> Dict:
+    def process_test(self, video_path: str, test_type: str,
+                     session: Optional[AnalysisSession] = None) -> Dict:
         """Main method to process fitness test video"""
         try:
-            # Basic video analysis
-            video_analysis = self.video_analyzer.analyze_video(video_path)
+            if session is None:
+                session = get_analysis_session(video_path, self.video_analyzer, test_type)
+            
+            # Basic video analysis (shared with the cheat detector)
+            video_analysis = session.analysis
             
             # Extract test-specific metrics
-            movement_metrics = self.video_analyzer.extract_movement_metrics(video_path, test_type)
+            movement_metrics = session.movement_metrics(test_type)
             
             # Process based on test type
-            if test_type == "Vertical Jump":
-                results = self._process_vertical_jump(video_analysis, movement_metrics)
-            elif test_type == "Sit-ups (1 minute)":
-                results = self._process_situps(video_analysis, movement_metrics)
-            elif test_type == "50m Sprint":
-                results = self._process_sprint(video_analysis, movement_metrics)
-            elif test_type == "Push-ups":
-                results = self._process_pushups(video_analysis, movement_metrics)
-            elif test_type == "Flexibility Test":
-                results = self._process_flexibility(video_analysis, movement_metrics)
+            spec = get_test_spec(test_type)
+            if spec is not None:
+                results = getattr(self, f"_process_{spec['handler']}")(video_analysis, movement_metrics)
             else:
                 results = {'error': f'Unknown test type: {test_type}'}
             
@@ -158,8 +158,8 @@ class FitnessTestProcessor:
         movement_analysis = {
             'form_consistency': self._analyze_situp_form(movement_metrics),
             'range_of_motion': self._analyze_range_of_motion(movement_metrics),
-            'rhythm_consistency': self._analyze_rhythm_consistency(cadence, rep_count),
-            'fatigue_analysis': self._analyze_fatigue_pattern(video_analysis)
+            'rhythm_consistency': self._analyze_rhythm_consistency(cadence, rep_count, movement_metrics.get('reps', [])),
+            'fatigue_analysis': self._analyze_fatigue_pattern(video_analysis, movement_metrics.get('reps', []))
         }
         
         return {
@@ -255,7 +255,7 @@ class FitnessTestProcessor:
             'form_quality': self._analyze_pushup_form(movement_metrics),
             'depth_consistency': self._analyze_pushup_depth(movement_metrics),
             'body_alignment': self._analyze_plank_position(video_analysis),
-            'endurance_pattern': self._analyze_endurance_pattern(video_analysis)
+            'endurance_pattern': self._analyze_endurance_pattern(video_analysis, movement_metrics.get('reps', []))
         }
         
         return {
@@ -344,25 +344,20 @@ class FitnessTestProcessor:
     
     def _analyze_body_alignment(self, analysis: Dict) -> Dict:
         """Analyze body alignment during movement"""
-        pose_detections = analysis.get('pose_detections', [])
+        landmarks = analysis.get('landmarks')
         
-        if not pose_detections:
+        if landmarks is None or not len(landmarks):
             return {'alignment_score': 50}
         
-        # Simple alignment check based on shoulder-hip alignment
-        alignment_scores = []
+        # Simple alignment check: shoulders and hips should be level
+        signals = get_signal_bank(analysis)
+        shoulder_level = signals['shoulder_level']
+        hip_level = signals['hip_level']
         
-        for detection in pose_detections:
-            if all(point in detection for point in ['left_shoulder', 'right_shoulder', 'left_hip', 'right_hip']):
-                # Check if shoulders and hips are level
-                shoulder_level = abs(detection['left_shoulder']['y'] - detection['right_shoulder']['y'])
-                hip_level = abs(detection['left_hip']['y'] - detection['right_hip']['y'])
-                
-                alignment_score = 100 - (shoulder_level + hip_level) * 500  # Normalize
-                alignment_scores.append(max(alignment_score, 0))
+        alignment_scores = np.maximum(100 - (shoulder_level + hip_level) * 500, 0)  # Normalize
         
         return {
-            'alignment_score': np.mean(alignment_scores) if alignment_scores else 50
+            'alignment_score': float(np.mean(alignment_scores))
         }
     
     def _analyze_preparation_phase(self, metrics: Dict) -> Dict:
@@ -388,30 +383,42 @@ class FitnessTestProcessor:
         """Analyze range of motion in exercise"""
         angle_range = metrics.get('angle_range', 0)
         
+        depths = [rep['depth_angle'] for rep in metrics.get('reps', [])]
+        
         return {
             'full_rom_percentage': min(angle_range / 60 * 100, 100),  # 60 degrees as full ROM
-            'consistency': 85,     # Placeholder
+            'consistency': self._consistency_score(depths),
             'quality': 80          # Placeholder
         }
     
-    def _analyze_rhythm_consistency(self, cadence: float, rep_count: int) -> Dict:
-        """Analyze rhythm consistency"""
+    def _analyze_rhythm_consistency(self, cadence: float, rep_count: int, reps: List[Dict]) -> Dict:
+        """Analyze rhythm consistency from the per-rep timings"""
         if rep_count == 0:
             return {'rhythm_score': 0}
         
-        expected_time_per_rep = 60 / cadence if cadence > 0 else 0
+        # Tempo: how evenly long each rep takes; pacing: how evenly reps are spaced
+        durations = [rep['duration'] for rep in reps]
+        intervals = np.diff([rep['start_time'] for rep in reps])
         
         return {
             'rhythm_score': min(85 + (cadence / 60 * 15), 100),  # Better rhythm with moderate cadence
-            'tempo_consistency': 80,   # Placeholder
-            'pacing_quality': 85       # Placeholder
+            'tempo_consistency': self._consistency_score(durations),
+            'pacing_quality': self._consistency_score(intervals)
         }
     
-    def _analyze_fatigue_pattern(self, analysis: Dict) -> Dict:
+    def _consistency_score(self, values) -> float:
+        """0-100 score from the coefficient of variation of a series (50 without enough data)"""
+        if len(values) < 2 or np.mean(values) <= 0:
+            return 50
+        
+        variation = np.std(values) / np.mean(values)
+        return float(max(100 - variation * 100, 0))
+    
+    def _analyze_fatigue_pattern(self, analysis: Dict, reps: Optional[List[Dict]] = None) -> Dict:
         """Analyze fatigue pattern during exercise"""
         motion_intensity = analysis.get('motion_intensity', [])
         
-        if not motion_intensity:
+        if not len(motion_intensity):
             return {'fatigue_resistance': 50}
         
         # Check if motion intensity decreases over time (indicating fatigue)
@@ -422,10 +429,22 @@ class FitnessTestProcessor:
         else:
             fatigue_ratio = 1.0
         
+        # Compare the first and last third of the reps: slower or shallower reps late indicate fatigue
+        reps = reps or []
+        if len(reps) >= 3:
+            third = len(reps) // 3
+            early_duration = np.mean([rep['duration'] for rep in reps[:third]])
+            late_duration = np.mean([rep['duration'] for rep in reps[-third:]])
+            endurance_score = min(early_duration / late_duration * 100, 100) if late_duration > 0 else 50
+            consistency_rating = self._consistency_score([rep['depth_angle'] for rep in reps])
+        else:
+            endurance_score = 50
+            consistency_rating = 50
+        
         return {
             'fatigue_resistance': min(fatigue_ratio * 100, 100),
-            'endurance_score': 80,     # Placeholder
-            'consistency_rating': 85   # Placeholder
+            'endurance_score': endurance_score,
+            'consistency_rating': consistency_rating
         }
     
     def _analyze_acceleration(self, analysis: Dict) -> Dict:
@@ -481,10 +500,11 @@ class FitnessTestProcessor:
     def _analyze_pushup_depth(self, metrics: Dict) -> Dict:
         """Analyze push-up depth consistency"""
         angle_range = metrics.get('angle_range', 0)
+        depths = [rep['depth_angle'] for rep in metrics.get('reps', [])]
         
         return {
             'depth_score': min(angle_range / 80 * 100, 100),  # Full range expected
-            'consistency': 85,         # Placeholder
+            'consistency': self._consistency_score(depths),
             'quality': 80              # Placeholder
         }
     
@@ -492,15 +512,15 @@ class FitnessTestProcessor:
         """Analyze plank position maintenance"""
         return self._analyze_body_alignment(analysis)
     
-    def _analyze_endurance_pattern(self, analysis: Dict) -> Dict:
+    def _analyze_endurance_pattern(self, analysis: Dict, reps: Optional[List[Dict]] = None) -> Dict:
         """Analyze endurance pattern"""
-        return self._analyze_fatigue_pattern(analysis)
+        return self._analyze_fatigue_pattern(analysis, reps)
     
     def _analyze_movement_smoothness(self, analysis: Dict) -> Dict:
         """Analyze smoothness of movement"""
         motion_intensity = analysis.get('motion_intensity', [])
         
-        if not motion_intensity:
+        if not len(motion_intensity):
             return {'smoothness_score': 50}
         
         # Calculate smoothness based on motion variance
@@ -0,0 +1,111 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Dict, Optional
+import numpy as np
+
+# Bump whenever a change to VideoAnalyzer alters its per-frame outputs
+ANALYZER_VERSION = 6
+
+DEFAULT_CACHE_DIR = "data/landmark_cache"
+
+# Analysis entries stored as arrays; everything else goes into the JSON metadata
+ARRAY_KEYS = ['landmarks', 'pose_frames', 'motion_intensity']
+
+# Analysis entries rebuilt on demand and never stored
+TRANSIENT_KEYS = ['signal_bank']
+
+def compute_video_hash(video_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Compute the SHA-256 content hash of a video file"""
+    digest = hashlib.sha256()
+    
+    with open(video_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    
+    return digest.hexdigest()
+
+def config_version(config: Dict) -> str:
+    """Short fingerprint of the analyzer settings that affect its output"""
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+class LandmarkCache:
+    """Content-addressed on-disk cache of video analysis results"""
+    
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+    
+    def _entry_path(self, video_hash: str, version: str) -> str:
+        return os.path.join(self.cache_dir, video_hash[:2], f"{self._entry_prefix(video_hash)}{version}.npz")
+    
+    def _entry_prefix(self, video_hash: str) -> str:
+        # Entries for other analyzer configurations share the prefix and coexist
+        return f"{video_hash}-v{ANALYZER_VERSION}-"
+    
+    def load(self, video_hash: str, version: str) -> Optional[Dict]:
+        """Load a cached analysis, or None when there is no entry for this video and version"""
+        path = self._entry_path(video_hash, version)
+        if not os.path.exists(path):
+            return None
+        
+        try:
+            with np.load(path, allow_pickle=False) as entry:
+                analysis = json.loads(str(entry['metadata']))
+                for key in ARRAY_KEYS:
+                    analysis[key] = entry[key]
+            
+            analysis['resolution'] = tuple(analysis['resolution'])
+            return analysis
+        except Exception as e:
+            logging.warning(f"Discarding unreadable landmark cache entry {path}: {str(e)}")
+            self._remove(path)
+            return None
+    
+    def save(self, video_hash: str, version: str, analysis: Dict):
+        """Persist an analysis and drop entries for the same video from older analyzer versions"""
+        path = self._entry_path(video_hash, version)
+        metadata = {key: value for key, value in analysis.items()
+                    if key not in ARRAY_KEYS and key not in TRANSIENT_KEYS}
+        
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            
+            # Write to a temporary file first so readers never see a partial entry
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.npz')
+            with os.fdopen(fd, 'wb') as f:
+                np.savez_compressed(
+                    f,
+                    metadata=np.array(json.dumps(metadata, default=_json_default)),
+                    **{key: np.asarray(analysis[key]) for key in ARRAY_KEYS}
+                )
+            os.replace(temp_path, path)
+        except Exception as e:
+            logging.warning(f"Could not write landmark cache entry {path}: {str(e)}")
+            return
+        
+        self._invalidate_stale(video_hash)
+    
+    def _invalidate_stale(self, video_hash: str):
+        """Remove cached entries for this video written under other ANALYZER_VERSIONs"""
+        prefix = self._entry_prefix(video_hash)
+        for path in glob.glob(os.path.join(self.cache_dir, video_hash[:2], f"{video_hash}-*.npz")):
+            if not os.path.basename(path).startswith(prefix):
+                self._remove(path)
+    
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def _json_default(value):
+    """Convert NumPy scalars and arrays left in the analysis metadata"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
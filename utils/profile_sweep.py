@@ -0,0 +1,111 @@
+"""
+Accuracy/speed sweep of VideoAnalyzer profiles over a set of reference clips.
+
+Each clip is analysed under every profile; throughput is reported alongside
+the drift of the key test metrics against the 'accurate' profile. Throughput is
+clip seconds analysed per wall-clock second, which compares profiles reading a
+proxy with profiles reading the original. Proxy transcoding happens outside the
+timed analysis and is reported on its own.
+
+Usage:
+    python -m utils.profile_sweep --clip "Vertical Jump" clips/jump.mp4 \
+        --clip "Sit-ups (1 minute)" clips/situps.mp4 --output sweep.json
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+from utils.video_analysis import VideoAnalyzer, ANALYZER_PROFILES
+from utils.video_proxy import remove_proxy_videos
+
+# Metrics compared against the baseline profile
+DRIFT_METRICS = ['rep_count', 'jump_height_normalized', 'flight_time_seconds']
+
+BASELINE_PROFILE = 'accurate'
+
+def run_profile_sweep(clips: List[Tuple[str, str]], profiles: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Analyse each (test_type, video_path) clip under each profile
+    
+    Returns:
+        One result per clip and profile with clip seconds per second and metric drift
+    """
+    profiles = profiles or list(ANALYZER_PROFILES.keys())
+    if BASELINE_PROFILE not in profiles:
+        profiles = [BASELINE_PROFILE] + profiles
+    
+    # Bypass the landmark cache so every profile is actually timed
+    analyzers = {profile: VideoAnalyzer.from_profile(profile, cache_dir=None) for profile in profiles}
+    results = []
+    
+    for test_type, video_path in clips:
+        clip_results = {}
+        
+        for profile, analyzer in analyzers.items():
+            # Ingest the clip first so only the first profile with a proxy pays the transcode,
+            # and it is not counted against that profile's analysis throughput
+            start_time = time.perf_counter()
+            analyzer.create_proxy(video_path)
+            proxy_seconds = time.perf_counter() - start_time
+            
+            start_time = time.perf_counter()
+            analysis = analyzer.analyze_video(video_path, test_type)
+            metrics = analyzer.compute_movement_metrics(analysis, test_type)
+            elapsed = time.perf_counter() - start_time
+            
+            clip_results[profile] = {
+                'video_path': video_path,
+                'test_type': test_type,
+                'profile': profile,
+                'seconds': elapsed,
+                'proxy_seconds': proxy_seconds,
+                'clip_seconds_per_second': analysis['duration'] / elapsed if elapsed > 0 else 0,
+                'metrics': {key: metrics.get(key) for key in DRIFT_METRICS if key in metrics},
+                'error': metrics.get('error')
+            }
+        
+        remove_proxy_videos(video_path)
+        
+        baseline = clip_results[BASELINE_PROFILE]['metrics']
+        for result in clip_results.values():
+            result['drift'] = {
+                key: value - baseline[key]
+                for key, value in result['metrics'].items()
+                if baseline.get(key) is not None and value is not None
+            }
+            results.append(result)
+    
+    return results
+
+def format_sweep_report(results: List[Dict]) -> str:
+    """Format sweep results as a plain-text table"""
+    lines = [f"{'clip':<30} {'profile':<9} {'x real':>8} {'proxy s':>8}  drift vs {BASELINE_PROFILE}"]
+    
+    for result in results:
+        drift = ', '.join(f"{key}={value:+.3f}" for key, value in result['drift'].items())
+        clip = f"{result['test_type']}: {result['video_path']}"[-30:]
+        lines.append(f"{clip:<30} {result['profile']:<9} {result['clip_seconds_per_second']:>8.2f} "
+                     f"{result['proxy_seconds']:>8.2f}  "
+                     f"{result['error'] or drift or '-'}")
+    
+    return '\n'.join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare VideoAnalyzer profiles on reference clips")
+    parser.add_argument('--clip', nargs=2, action='append', required=True,
+                        metavar=('TEST_TYPE', 'VIDEO_PATH'), help="Reference clip and its test type")
+    parser.add_argument('--profiles', nargs='+', choices=list(ANALYZER_PROFILES.keys()),
+                        help="Profiles to sweep (default: all)")
+    parser.add_argument('--output', help="Write the raw results to this JSON file")
+    args = parser.parse_args()
+    
+    results = run_profile_sweep([tuple(clip) for clip in args.clip], args.profiles)
+    print(format_sweep_report(results))
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, default=float)
+
+if __name__ == "__main__":
+    main()
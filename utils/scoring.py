@@ -1,7 +1,8 @@
 import numpy as np
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 from datetime import datetime
 from data.benchmarks import PERFORMANCE_BENCHMARKS, AGE_GROUPS, GENDER_FACTORS
+from utils.test_specs import get_test_spec
 
 class PerformanceScorer:
     """Calculate performance scores based on age, gender, and test-specific benchmarks"""
@@ -29,18 +30,10 @@ class PerformanceScorer:
             age_group = self._get_age_group(age)
             
             # Get test-specific scoring method
-            if test_type == "Vertical Jump":
-                score_data = self._score_vertical_jump(test_results, age_group, gender)
-            elif test_type == "Sit-ups (1 minute)":
-                score_data = self._score_situps(test_results, age_group, gender)
-            elif test_type == "50m Sprint":
-                score_data = self._score_sprint(test_results, age_group, gender)
-            elif test_type == "Push-ups":
-                score_data = self._score_pushups(test_results, age_group, gender)
-            elif test_type == "Flexibility Test":
-                score_data = self._score_flexibility(test_results, age_group, gender)
-            else:
+            spec = get_test_spec(test_type)
+            if spec is None:
                 return {'error': f'Unknown test type: {test_type}'}
+            score_data = getattr(self, f"_score_{spec['handler']}")(test_results, age_group, gender)
             
             # Calculate overall performance metrics
             overall_score = self._calculate_overall_score(score_data, test_results)
@@ -0,0 +1,386 @@
+"""
+Multi-process analysis pipeline for the ingestion workers.
+
+Decode, pose inference and quality/face analysis run as three long-lived processes
+connected by a ring of frame slots in shared memory:
+    
+    decode --(slot)--> pose --(slot, landmarks)--> quality/face --(slot freed)--> decode
+
+The decoder writes each sampled frame once, downscaled and converted to RGB, into a
+free slot; the other stages read it in place. Only slot numbers and per-frame results
+travel through the queues, so frames are never pickled between processes. Each stage
+reports its own throughput, so the slowest stage of a video shows up directly.
+"""
+
+import logging
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, Optional, Tuple
+import cv2
+import numpy as np
+
+# Frame slots per ring; bounds how far the decoder can run ahead of the slowest stage
+RING_SLOTS = 8
+
+# Stages in pipeline order, as named in the throughput report
+STAGES = ['decode', 'pose', 'quality_face']
+
+# Scan entries filled by each consumer stage
+POSE_SCAN_KEYS = ['pose_frames', 'pose_landmarks', 'missed_pose_frames', 'visibility_stats']
+QUALITY_FACE_SCAN_KEYS = ['face_detections', 'face_checks', 'face_frames', 'multiple_face_frames',
+                          'confident_faces', 'face_confidence_stats', 'frame_quality_scores',
+                          'quality_stats']
+
+# Sampled frames between progress reports from the last stage
+PROGRESS_FRAMES = 30
+
+class FrameRing:
+    """Fixed-size RGB frame slots in one shared memory block"""
+    
+    def __init__(self, shm: shared_memory.SharedMemory, slots: int, frame_shape: Tuple[int, ...],
+                 readonly: bool = False):
+        self._shm = shm
+        self.name = shm.name
+        self.slots = slots
+        self.frames = np.ndarray((slots,) + tuple(frame_shape), dtype=np.uint8, buffer=shm.buf)
+        if readonly:
+            # Read-only, contiguous slots are handed to MediaPipe without a copy
+            self.frames.flags.writeable = False
+    
+    @classmethod
+    def create(cls, slots: int, frame_shape: Tuple[int, ...]) -> 'FrameRing':
+        size = slots * int(np.prod(frame_shape))
+        return cls(shared_memory.SharedMemory(create=True, size=size), slots, frame_shape)
+    
+    @classmethod
+    def attach(cls, name: str, slots: int, frame_shape: Tuple[int, ...], readonly: bool = True) -> 'FrameRing':
+        return cls(shared_memory.SharedMemory(name=name), slots, frame_shape, readonly)
+    
+    def close(self):
+        """Detach from the block"""
+        self.frames = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # A stage still holds a slot view; the mapping goes when that view is collected
+            pass
+    
+    def unlink(self):
+        """Free the block once every stage is done with it"""
+        self._shm.unlink()
+
+def _stage_stats(frames: int, started: float, waited: float, error: Optional[str] = None) -> Dict:
+    """Throughput of one stage over one video; ``fps`` counts only the time spent working"""
+    busy = max(time.perf_counter() - started - waited, 0.0)
+    return {
+        'frames': frames,
+        'busy_seconds': busy,
+        'wait_seconds': waited,
+        'fps': frames / busy if busy > 0 else 0.0,
+        'error': error
+    }
+
+def _build_stage_analyzer(analyzer_config: Dict):
+    """Analyzer whose MediaPipe graphs run a stage; built once per stage process"""
+    from utils.video_analysis import VideoAnalyzer
+    return VideoAnalyzer(**analyzer_config)
+
+def _decode_stage(jobs: multiprocessing.Queue, pose_queue: multiprocessing.Queue,
+                  releases: multiprocessing.Queue, results: multiprocessing.Queue):
+    """
+    Decode process: sampled frames into free ring slots, slot numbers to the pose
+    stage along with the motion gate's verdict on whether pose should run
+    """
+    from utils.video_analysis import FrameBuffers, FrameReader, MotionGate
+    
+    while True:
+        job = jobs.get()
+        if job is None:
+            pose_queue.put(None)
+            break
+        
+        started = time.perf_counter()
+        waited = 0.0
+        error = None
+        sampled_frames = 0
+        frames_read = 0
+        
+        ring = FrameRing.attach(job['ring'], job['slots'], job['frame_shape'], readonly=False)
+        in_use = [False] * ring.slots
+        height, width = job['frame_shape'][:2]
+        buffers = FrameBuffers()
+        gate = MotionGate(*job['motion_gate']) if job['motion_gate'] else None
+        # Each frame is passed on once the next one is decoded, so the last can be marked for pose
+        pending = None
+        pose_queue.put(('start', job))
+        
+        cap = cv2.VideoCapture(job['video_path'])
+        try:
+            if not cap.isOpened():
+                raise Exception("Unable to open video file")
+            
+            reader = FrameReader(cap, job['frame_stride'])
+            for frame_index, frame in reader:
+                slot = sampled_frames % ring.slots
+                
+                # Wait for the last stage to free the slot
+                wait_start = time.perf_counter()
+                while in_use[slot]:
+                    in_use[releases.get()] = False
+                waited += time.perf_counter() - wait_start
+                
+                # Same downscale as the single-process scan, then RGB straight into the slot
+                if frame.shape[:2] != (height, width):
+                    frame = cv2.resize(frame, (width, height), dst=buffers.get('processed', (height, width, 3)),
+                                       interpolation=cv2.INTER_AREA)
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=ring.frames[slot])
+                pose_due = gate is None or gate.pose_due(ring.frames[slot], cv2.COLOR_RGB2GRAY)
+                
+                in_use[slot] = True
+                sampled_frames += 1
+                frames_read = reader.frames_read
+                if pending is not None:
+                    pose_queue.put(pending)
+                pending = ('frame', frame_index, slot, pose_due)
+            
+            frames_read = reader.frames_read
+        except Exception as e:
+            error = f"frame {frames_read}: {str(e)}"
+        finally:
+            cap.release()
+        
+        # End the series on a pose run so a still tail is interpolated too
+        if pending is not None:
+            pose_queue.put(pending[:3] + (True,))
+        
+        pose_queue.put(('end',))
+        
+        # Every slot comes back before the ring is detached
+        while any(in_use):
+            in_use[releases.get()] = False
+        ring.close()
+        
+        results.put(('done', 'decode', {'frames_read': frames_read, 'sampled_frames': sampled_frames},
+                     _stage_stats(sampled_frames, started, waited, error)))
+
+def _pose_stage(analyzer_config: Dict, pose_queue: multiprocessing.Queue,
+                face_queue: multiprocessing.Queue, results: multiprocessing.Queue):
+    """
+    Pose process: landmarks for each gated-in slot; the latest landmarks go on with
+    the slot to the quality/face stage for its face crops
+    """
+    analyzer = _build_stage_analyzer(analyzer_config)
+    job = ring = scan = pose_roi = last_landmarks = error = None
+    frames = 0
+    started = waited = 0.0
+    
+    while True:
+        wait_start = time.perf_counter()
+        message = pose_queue.get()
+        waited += time.perf_counter() - wait_start
+        
+        if message is None:
+            face_queue.put(None)
+            break
+        
+        if message[0] == 'start':
+            job = message[1]
+            ring = FrameRing.attach(job['ring'], job['slots'], job['frame_shape'])
+            scan = analyzer._new_scan(landmark_columns=job['landmark_columns'], signals=job['signals'])
+            # The previous video's tracking state does not carry over
+            analyzer.pose.reset()
+            pose_roi = last_landmarks = error = None
+            frames = 0
+            started = time.perf_counter()
+            waited = 0.0
+            face_queue.put(message)
+        
+        elif message[0] == 'frame':
+            _, frame_index, slot, pose_due = message
+            if error is None and pose_due:
+                try:
+                    last_landmarks, pose_roi = analyzer._detect_pose(ring.frames[slot], pose_roi)
+                    analyzer._record_pose(scan, frame_index, last_landmarks)
+                    frames += 1
+                except Exception as e:
+                    error = f"frame {frame_index}: {str(e)}"
+            face_queue.put(('frame', frame_index, slot, last_landmarks))
+        
+        else:
+            face_queue.put(message)
+            ring.close()
+            results.put(('done', 'pose', {key: scan[key] for key in POSE_SCAN_KEYS},
+                         _stage_stats(frames, started, waited, error)))
+
+def _quality_face_stage(analyzer_config: Dict, face_queue: multiprocessing.Queue,
+                        releases: multiprocessing.Queue, results: multiprocessing.Queue):
+    """Quality/face process: frame quality and scheduled face checks, then frees the slot"""
+    from utils.video_analysis import FrameBuffers
+    
+    analyzer = _build_stage_analyzer(analyzer_config)
+    job = ring = scan = buffers = error = None
+    frames = face_interval = next_face_frame = 0
+    started = waited = 0.0
+    
+    while True:
+        wait_start = time.perf_counter()
+        message = face_queue.get()
+        waited += time.perf_counter() - wait_start
+        
+        if message is None:
+            break
+        
+        if message[0] == 'start':
+            job = message[1]
+            ring = FrameRing.attach(job['ring'], job['slots'], job['frame_shape'])
+            scan = analyzer._new_scan(landmark_columns=job['landmark_columns'], signals=job['signals'])
+            buffers = FrameBuffers()
+            face_interval = analyzer._face_interval(job['fps'])
+            next_face_frame = 0
+            error = None
+            frames = 0
+            started = time.perf_counter()
+            waited = 0.0
+        
+        elif message[0] == 'frame':
+            _, frame_index, slot, landmarks = message
+            if error is None:
+                try:
+                    frame = ring.frames[slot]
+                    
+                    # Face checks use the latest pose, as in the single-process scan
+                    if frame_index >= next_face_frame and not analyzer._face_target_reached(scan):
+                        next_face_frame = frame_index + face_interval
+                        scan['face_checks'] += 1
+                        analyzer._record_faces(scan, analyzer._detect_faces(frame, landmarks))
+                    
+                    analyzer._record_quality(scan, analyzer._frame_quality(frame, buffers, cv2.COLOR_RGB2GRAY))
+                    frames += 1
+                except Exception as e:
+                    error = f"frame {frame_index}: {str(e)}"
+            
+            releases.put(slot)
+            if frames % PROGRESS_FRAMES == 0:
+                results.put(('progress', frame_index + 1))
+        
+        else:
+            ring.close()
+            results.put(('done', 'quality_face', {key: scan[key] for key in QUALITY_FACE_SCAN_KEYS},
+                         _stage_stats(frames, started, waited, error)))
+
+class StagePipeline:
+    """
+    Long-lived decode, pose and quality/face processes shared by every video an
+    analyzer scans; each stage process builds its MediaPipe graphs once
+    """
+    
+    def __init__(self, analyzer_config: Dict, ring_slots: int = RING_SLOTS):
+        # Stage processes run plain single-process analyzers without a cache of their own
+        self.analyzer_config = {**analyzer_config, 'stage_processes': False, 'stage_workers': 0,
+                                'segment_workers': 1, 'cache_dir': None}
+        self.ring_slots = ring_slots
+        self._processes = []
+        self._queues = None
+        
+        # Per-stage throughput of the last scan, keyed by STAGES
+        self.stage_stats = {}
+    
+    def start(self):
+        """Start the stage processes if they are not running"""
+        if self._processes:
+            return
+        
+        # Spawned stages avoid inheriting MediaPipe graph state through fork
+        context = multiprocessing.get_context('spawn')
+        jobs, pose_queue, face_queue, releases, results = (context.Queue() for _ in range(5))
+        # Every queue stays referenced here; spawned children attach to them after start()
+        self._queues = {'jobs': jobs, 'pose': pose_queue, 'face': face_queue,
+                        'releases': releases, 'results': results}
+        self._processes = [
+            context.Process(target=_decode_stage, args=(jobs, pose_queue, releases, results),
+                            name='analysis-decode', daemon=True),
+            context.Process(target=_pose_stage, args=(self.analyzer_config, pose_queue, face_queue, results),
+                            name='analysis-pose', daemon=True),
+            context.Process(target=_quality_face_stage, args=(self.analyzer_config, face_queue, releases, results),
+                            name='analysis-quality-face', daemon=True)
+        ]
+        for process in self._processes:
+            process.start()
+    
+    def close(self, terminate: bool = False):
+        """Stop the stage processes; ``terminate`` kills them without finishing queued work"""
+        if not self._processes:
+            return
+        
+        if terminate:
+            for process in self._processes:
+                process.terminate()
+        else:
+            self._queues['jobs'].put(None)
+        
+        for process in self._processes:
+            process.join()
+        
+        self._processes = []
+        self._queues = None
+    
+    def scan(self, video_path: str, frame_stride: int, scan: Dict,
+             frame_shape: Tuple[int, int, int], fps: float) -> Iterator[int]:
+        """
+        Scan a video through the stage processes into ``scan``
+        
+        ``frame_shape`` is the (height, width, 3) size frames are processed at.
+        Yields the number of frames done as the last stage progresses; a stage error
+        is logged and leaves the scan with the frames finished before it, as in
+        the single-process scan.
+        """
+        self.start()
+        ring = FrameRing.create(self.ring_slots, frame_shape)
+        self.stage_stats = {}
+        parts = {}
+        
+        try:
+            self._queues['jobs'].put({
+                'video_path': video_path,
+                'frame_stride': frame_stride,
+                'fps': fps,
+                'ring': ring.name,
+                'slots': ring.slots,
+                'frame_shape': tuple(frame_shape),
+                'landmark_columns': scan['landmark_columns'],
+                'signals': scan['signals'],
+                'motion_gate': scan['motion_gate']
+            })
+            
+            while len(parts) < len(STAGES):
+                try:
+                    message = self._queues['results'].get(timeout=1.0)
+                except queue.Empty:
+                    if not all(process.is_alive() for process in self._processes):
+                        raise Exception("An analysis stage process exited unexpectedly")
+                    continue
+                
+                if message[0] == 'progress':
+                    yield message[1]
+                else:
+                    _, stage, part, stats = message
+                    parts[stage] = part
+                    self.stage_stats[stage] = stats
+        except BaseException:
+            # A failed or abandoned scan leaves the stages mid-video; restart them next time
+            self.close(terminate=True)
+            raise
+        finally:
+            ring.close()
+            ring.unlink()
+        
+        for stage in STAGES:
+            if self.stage_stats[stage]['error']:
+                logging.error(f"Error in {stage} stage for {video_path}: {self.stage_stats[stage]['error']}")
+        
+        scan['frames_read'] = parts['decode']['frames_read']
+        scan['sampled_frames'] = parts['decode']['sampled_frames']
+        scan.update(parts['pose'])
+        scan.update(parts['quality_face'])
@@ -0,0 +1,98 @@
+from typing import Dict, List, Optional
+
+# Landmarks kept for every test: the shoulders, hips and left arm read by the cheat
+# detector's alignment and anatomical checks
+BASE_LANDMARKS = ['left_shoulder', 'right_shoulder', 'left_elbow', 'left_wrist',
+                  'left_hip', 'right_hip']
+
+# Derived signals the analyzer can compute from the kept landmarks once the scan is done:
+# motion intensity between frames, and the high-activity phases found in it
+SIGNALS = ['motion', 'movement_phases']
+
+# Body points whose frame-to-frame displacement defines motion intensity; kept for
+# every test whose spec lists 'motion', so the signal means the same for all of them
+MOTION_KEY_POINTS = ['left_shoulder', 'right_shoulder', 'left_hip', 'right_hip',
+                     'left_knee', 'right_knee', 'left_ankle', 'right_ankle']
+
+# What each fitness test needs from the pipeline. Adding a test means adding a spec here
+# plus its handler methods; nothing else dispatches on the test type.
+#   handler:      suffix of the per-test methods VideoAnalyzer._analyze_<handler>,
+#                 FitnessTestProcessor._process_<handler>, PerformanceScorer._score_<handler>
+#                 and CheatDetector._check_<handler>_movements
+#   frame_stride: frames between pose samples (sprint and jump timing need the full rate)
+#   landmarks:    landmarks the test's metrics read, kept on top of BASE_LANDMARKS (and
+#                 MOTION_KEY_POINTS when the test uses motion)
+#   signals:      derived signals from SIGNALS the test's metrics and checks read
+#   rep_angle:    joint-angle signal (from JOINT_ANGLES in video_analysis) and rep thresholds:
+#                 a rep starts when the angle drops below the first threshold and ends when
+#                 it rises above the second
+#   live_metric:  value streamed while the video is analysed ('rep_count' or 'hip_height')
+#   event_frames: frame numbers in the handler's metrics that time the test; with
+#                 VideoAnalyzer.event_search_fps set they are located by a coarse pass and
+#                 refined by re-scanning only the frames around them at the test's stride
+#   motion_gated: with VideoAnalyzer.motion_gate_threshold set, pose runs at the full
+#                 sampling rate only while the athlete moves, and at still_pose_rate through
+#                 still periods (standing before a jump, holding a stretch)
+TEST_SPECS = {
+    'Vertical Jump': {
+        'handler': 'vertical_jump',
+        'frame_stride': 1,
+        'landmarks': ['left_hip', 'right_hip'],
+        'signals': ['motion', 'movement_phases'],
+        'live_metric': 'hip_height',
+        'event_frames': ['takeoff_frame', 'peak_frame', 'landing_frame'],
+        'motion_gated': True
+    },
+    'Sit-ups (1 minute)': {
+        'handler': 'situps',
+        'frame_stride': 2,
+        'landmarks': ['left_shoulder', 'right_shoulder', 'left_hip', 'right_hip',
+                      'left_knee', 'right_knee'],
+        'signals': ['motion'],
+        'rep_angle': ('torso_angle', 60, 90),
+        'live_metric': 'rep_count'
+    },
+    '50m Sprint': {
+        'handler': 'sprint',
+        'frame_stride': 1,
+        'landmarks': ['left_hip', 'right_hip'],
+        'signals': ['motion'],
+        'event_frames': ['start_frame', 'finish_frame']
+    },
+    'Push-ups': {
+        'handler': 'pushups',
+        'frame_stride': 2,
+        'landmarks': ['left_shoulder', 'right_shoulder', 'left_elbow', 'right_elbow',
+                      'left_wrist', 'right_wrist'],
+        'signals': ['motion', 'movement_phases'],
+        'rep_angle': ('elbow_angle', 90, 150),
+        'live_metric': 'rep_count'
+    },
+    'Flexibility Test': {
+        'handler': 'flexibility',
+        'frame_stride': 5,
+        'landmarks': ['left_wrist', 'right_wrist', 'left_hip', 'right_hip'],
+        'signals': ['motion'],
+        'motion_gated': True
+    }
+}
+
+def get_test_spec(test_type: Optional[str]) -> Optional[Dict]:
+    """Spec of a test type, or None for an unknown or unspecified test"""
+    return TEST_SPECS.get(test_type)
+
+def landmarks_for_test(test_type: Optional[str]) -> Optional[List[str]]:
+    """Landmarks kept for a test, or None when every landmark should be kept"""
+    spec = get_test_spec(test_type)
+    if spec is None:
+        return None
+    
+    kept = set(BASE_LANDMARKS) | set(spec['landmarks'])
+    if 'motion' in spec['signals']:
+        kept.update(MOTION_KEY_POINTS)
+    return sorted(kept)
+
+def signals_for_test(test_type: Optional[str]) -> List[str]:
+    """Derived signals computed for a test; all of them for an unknown test"""
+    spec = get_test_spec(test_type)
+    return list(spec['signals']) if spec is not None else list(SIGNALS)
@@ -1,17 +1,551 @@
 import cv2
 import numpy as np
 import mediapipe as mp
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Iterator
 import logging
+import queue
+import threading
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from utils.landmark_cache import LandmarkCache, DEFAULT_CACHE_DIR, compute_video_hash, config_version
+from utils.video_proxy import create_proxy_video, find_proxy_video, PROXY_LONG_SIDE, PROXY_FPS
+from utils.stage_pipeline import StagePipeline
+from utils.test_specs import get_test_spec, landmarks_for_test, signals_for_test, MOTION_KEY_POINTS
+
+# Analyzer profiles trading pose accuracy for speed; values are VideoAnalyzer arguments
+ANALYZER_PROFILES = {
+    'fast': {
+        'model_complexity': 0,
+        'proxy_long_side': PROXY_LONG_SIDE,
+        'processing_long_side': 480,
+        'frame_stride_scale': 2.0,
+        'pose_roi_tracking': True,
+        'event_search_fps': 5.0
+    },
+    'balanced': {
+        'model_complexity': 1,
+        # Reads the original: a 640p proxy would make the 960 processing size moot
+        'proxy_long_side': None,
+        'processing_long_side': 960,
+        'frame_stride_scale': 1.0,
+        'pose_roi_tracking': False
+    },
+    'accurate': {
+        'model_complexity': 2,
+        'processing_long_side': None,
+        'proxy_long_side': None,
+        'frame_stride': 1,
+        'pose_roi_tracking': False,
+        'motion_gate_threshold': None
+    }
+}
+
+# Key landmarks for fitness assessment, in landmark tensor order
+POSE_LANDMARK_NAMES = [
+    'nose',
+    'left_shoulder', 'right_shoulder',
+    'left_elbow', 'right_elbow',
+    'left_wrist', 'right_wrist',
+    'left_hip', 'right_hip',
+    'left_knee', 'right_knee',
+    'left_ankle', 'right_ankle'
+]
+LANDMARK_INDEX = {name: i for i, name in enumerate(POSE_LANDMARK_NAMES)}
+
+# Last axis of the landmark tensor
+LANDMARK_FIELDS = ['x', 'y', 'z', 'visibility']
+
+
+# Joint-angle signals: (first, joint, second landmark) on the left side; the right side
+# is mirrored and each frame uses the better visible side
+JOINT_ANGLES = {
+    'torso_angle': ('left_shoulder', 'left_hip', 'left_knee'),
+    'elbow_angle': ('left_shoulder', 'left_elbow', 'left_wrist')
+}
+
+def get_landmark(analysis: Dict, name: str) -> np.ndarray:
+    """(frames, 4) x/y/z/visibility series of one landmark from an analysis result"""
+    return analysis['landmarks'][:, analysis['landmark_index'][name]]
+
+def joint_angles(first: np.ndarray, joint: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Per-frame 2D angle in degrees at ``joint`` between the two adjoining landmarks"""
+    vec1 = first[:, :2] - joint[:, :2]
+    vec2 = second[:, :2] - joint[:, :2]
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cos_angle = np.sum(vec1 * vec2, axis=1) / (np.linalg.norm(vec1, axis=1) * np.linalg.norm(vec2, axis=1))
+    return np.degrees(np.arccos(np.clip(cos_angle, -1, 1)))
+
+def bilateral_joint_angles(landmarks: np.ndarray, landmark_index: Dict[str, int],
+                           joint_names: Tuple[str, str, str]) -> np.ndarray:
+    """
+    Per-frame 2D joint angle in degrees, taken from whichever body side is better visible
+    
+    ``joint_names`` are the left-side (first, joint, second) landmarks; both sides
+    are computed in one pass and each frame uses the side whose three landmarks
+    have the higher minimum visibility. A side missing from the tensor is skipped.
+    """
+    sides = [joint_names, tuple(name.replace('left_', 'right_') for name in joint_names)]
+    columns = np.array([[landmark_index[name] for name in names] for names in sides
+                        if all(name in landmark_index for name in names)])
+    
+    # (frames, sides, 3 landmarks, fields)
+    points = landmarks[:, columns]
+    vec1 = points[:, :, 0, :2] - points[:, :, 1, :2]
+    vec2 = points[:, :, 2, :2] - points[:, :, 1, :2]
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cos_angle = np.sum(vec1 * vec2, axis=2) / (np.linalg.norm(vec1, axis=2) * np.linalg.norm(vec2, axis=2))
+    angles = np.degrees(np.arccos(np.clip(cos_angle, -1, 1)))
+    
+    best_side = np.argmax(points[:, :, :, 3].min(axis=2), axis=1)
+    return angles[np.arange(len(angles)), best_side]
+
+def detect_reps(angles: np.ndarray, enter_below: float, exit_above: float) -> Dict[str, np.ndarray]:
+    """
+    Find reps in a joint-angle series with hysteresis
+    
+    A rep starts at the first frame below ``enter_below`` and ends at the first
+    later frame above ``exit_above``; a rep still open at the end is not counted.
+    
+    Returns:
+        Arrays of rep 'start' and 'end' indices and 'depth' (minimum angle in the rep)
+    """
+    frame_count = len(angles)
+    
+    # Threshold crossings set the state; frames in the dead band keep the previous state
+    events = np.zeros(frame_count, dtype=np.int8)
+    events[angles < enter_below] = 1
+    events[angles > exit_above] = -1
+    last_event = np.maximum.accumulate(np.where(events != 0, np.arange(frame_count), -1))
+    in_rep = (last_event >= 0) & (events[np.maximum(last_event, 0)] == 1)
+    
+    edges = np.diff(in_rep.astype(np.int8), prepend=0)
+    ends = np.flatnonzero(edges == -1)
+    starts = np.flatnonzero(edges == 1)[:len(ends)]
+    
+    # Minimum angle over each [start, end) span
+    depth = (np.fmin.reduceat(angles, np.column_stack([starts, ends]).ravel())[::2]
+             if len(starts) else np.empty(0))
+    
+    return {'start': starts, 'end': ends, 'depth': depth}
+
+class SignalBank:
+    """
+    Per-frame signals derived from an analysis's landmark series
+    
+    Signals are looked up by name (``bank['hip_height']``), computed as arrays on
+    first access and memoised, so the analyzer, the test processor and the cheat
+    detector share one computation per analysis.
+    """
+    
+    def __init__(self, analysis: Dict):
+        self.analysis = analysis
+        self._signals = {}
+    
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name not in self._signals:
+            if name in JOINT_ANGLES:
+                signal = bilateral_joint_angles(self.analysis['landmarks'], self.analysis['landmark_index'],
+                                                JOINT_ANGLES[name])
+            else:
+                compute = getattr(self, f'_compute_{name}', None)
+                if compute is None:
+                    raise KeyError(f"Unknown signal: {name}")
+                signal = compute()
+            self._signals[name] = signal
+        return self._signals[name]
+    
+    def _landmark(self, name: str) -> np.ndarray:
+        return get_landmark(self.analysis, name)
+    
+    def _compute_hip_x(self) -> np.ndarray:
+        """Mean hip x position, the body's horizontal position"""
+        return (self._landmark('left_hip')[:, 0] + self._landmark('right_hip')[:, 0]) / 2
+    
+    def _compute_hip_height(self) -> np.ndarray:
+        """Mean hip height (1 - y, so higher values are higher positions)"""
+        return 1.0 - (self._landmark('left_hip')[:, 1] + self._landmark('right_hip')[:, 1]) / 2
+    
+    def _compute_wrist_reach(self) -> np.ndarray:
+        """Forward reach: mean wrist x relative to mean hip x"""
+        return (self._landmark('left_wrist')[:, 0] + self._landmark('right_wrist')[:, 0]) / 2 - self['hip_x']
+    
+    def _compute_shoulder_level(self) -> np.ndarray:
+        """Vertical offset between the shoulders"""
+        return np.abs(self._landmark('left_shoulder')[:, 1] - self._landmark('right_shoulder')[:, 1])
+    
+    def _compute_hip_level(self) -> np.ndarray:
+        """Vertical offset between the hips"""
+        return np.abs(self._landmark('left_hip')[:, 1] - self._landmark('right_hip')[:, 1])
+    
+    def _compute_shoulder_width(self) -> np.ndarray:
+        return np.abs(self._landmark('left_shoulder')[:, 0] - self._landmark('right_shoulder')[:, 0])
+    
+    def _compute_hip_width(self) -> np.ndarray:
+        return np.abs(self._landmark('left_hip')[:, 0] - self._landmark('right_hip')[:, 0])
+    
+    def _compute_upper_arm_length(self) -> np.ndarray:
+        """Left shoulder-to-elbow distance in the image plane"""
+        return np.linalg.norm(self._landmark('left_shoulder')[:, :2] - self._landmark('left_elbow')[:, :2], axis=1)
+    
+    def _compute_forearm_length(self) -> np.ndarray:
+        """Left elbow-to-wrist distance in the image plane"""
+        return np.linalg.norm(self._landmark('left_elbow')[:, :2] - self._landmark('left_wrist')[:, :2], axis=1)
+
+def get_signal_bank(analysis: Dict) -> SignalBank:
+    """The analysis's signal bank, attached to the analysis on first use"""
+    bank = analysis.get('signal_bank')
+    if bank is None:
+        bank = analysis['signal_bank'] = SignalBank(analysis)
+    return bank
+
+class RunningStats:
+    """Welford accumulator for the mean and variance of a stream of values"""
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+        self._m2 = 0.0
+    
+    def update(self, value: float):
+        """Add one value"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+    
+    def merge(self, other: 'RunningStats'):
+        """Fold in the values accumulated by another instance"""
+        if other.count == 0:
+            return
+        
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+    
+    @property
+    def variance(self) -> float:
+        """Population variance, as ``np.var`` computes it"""
+        return self._m2 / self.count if self.count > 0 else 0.0
+    
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'variance': self.variance,
+            'std': float(np.sqrt(self.variance)),
+            'min': self.min if self.count > 0 else 0.0,
+            'max': self.max if self.count > 0 else 0.0
+        }
+
+class FrameBuffers:
+    """Named scratch arrays reused from frame to frame, reallocated only when the shape changes"""
+    
+    def __init__(self):
+        self._arrays = {}
+    
+    def get(self, name: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        array = self._arrays.get(name)
+        if array is None or array.shape != shape or array.dtype != dtype:
+            array = self._arrays[name] = np.empty(shape, dtype=dtype)
+        return array
+
+class MotionGate:
+    """
+    Frame-difference gate choosing which sampled frames get pose inference
+    
+    Each sampled frame is shrunk to a tiny greyscale thumbnail and compared with
+    the previous one. While at least a ``threshold`` fraction of the thumbnail's
+    pixels changed by more than ``pixel_threshold`` grey levels, and for
+    ``hold_frames`` sampled frames after it drops, every frame is due; while the
+    scene is still, only every ``still_interval``-th one is.
+    """
+    
+    def __init__(self, threshold: float, still_interval: int, hold_frames: int,
+                 long_side: int = 64, pixel_threshold: int = 25):
+        self.threshold = threshold
+        self.still_interval = max(still_interval, 1)
+        self.hold_frames = hold_frames
+        self.long_side = long_side
+        self.pixel_threshold = pixel_threshold
+        self._previous = None
+        self._hold = 0
+        self._since_pose = 0
+    
+    def pose_due(self, frame: np.ndarray, gray_conversion: int = cv2.COLOR_BGR2GRAY) -> bool:
+        """Feed the next sampled frame; True when pose should run on it"""
+        height, width = frame.shape[:2]
+        scale = min(self.long_side / max(height, width), 1.0)
+        size = (max(int(round(width * scale)), 1), max(int(round(height * scale)), 1))
+        gray = cv2.cvtColor(cv2.resize(frame, size, interpolation=cv2.INTER_AREA), gray_conversion)
+        
+        if self._previous is None:
+            moving = True
+        elif self._changed_fraction(gray) >= self.threshold:
+            moving = True
+            self._hold = self.hold_frames
+        elif self._hold > 0:
+            # Settling after a movement, e.g. the landing of a jump
+            moving = True
+            self._hold -= 1
+        else:
+            moving = False
+        self._previous = gray
+        
+        due = moving or self._since_pose + 1 >= self.still_interval
+        self._since_pose = 0 if due else self._since_pose + 1
+        return due
+    
+    def _changed_fraction(self, gray: np.ndarray) -> float:
+        """Fraction of thumbnail pixels that changed since the previous frame"""
+        # A mean difference over the whole frame is dominated by the static
+        # background: a jumping athlete moves it by well under one grey level
+        diff = cv2.absdiff(gray, self._previous)
+        return cv2.countNonZero(cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)[1]) / gray.size
+
+def _readonly_crop(frame: np.ndarray, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+    """
+    Pixel crop of a frame for MediaPipe
+    
+    MediaPipe wraps read-only, contiguous input without copying it; a crop of a
+    read-only frame is strided, so it is copied once here and passed read-only.
+    """
+    crop = frame[y0:y1, x0:x1]
+    if crop.flags.c_contiguous:
+        return crop
+    
+    crop = np.ascontiguousarray(crop)
+    crop.flags.writeable = False
+    return crop
+
+class FrameReader:
+    """
+    Decode sampled frames from a capture, optionally on a background thread
+    
+    Frames are decoded into a ring of reused buffers, so a yielded frame is only
+    valid until the next one is requested.
+    """
+    
+    def __init__(self, cap: cv2.VideoCapture, frame_stride: int = 1, queue_size: int = 0,
+                 start_frame: int = 0, end_frame: Optional[int] = None):
+        self.cap = cap
+        self.frame_stride = max(frame_stride, 1)
+        self.queue_size = queue_size
+        self.end_frame = end_frame
+        
+        # Frame indices are absolute, so sampling stays aligned across segments
+        self.frames_read = start_frame
+        if start_frame > 0:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        
+        self._queue = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._error = None
+        
+        # Queued frames plus the one being consumed and the one being decoded
+        self._buffers = [None] * (queue_size + 2 if queue_size > 0 else 1)
+        self._next_buffer = 0
+    
+    def __enter__(self):
+        if self.queue_size > 0:
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._thread = threading.Thread(target=self._produce, name='frame-decoder', daemon=True)
+            self._thread.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        if self._thread is not None:
+            # Unblock a producer waiting on a full queue
+            while self._thread.is_alive():
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    self._thread.join(timeout=0.05)
+        return False
+    
+    def __iter__(self) -> Iterator[Tuple[int, np.ndarray]]:
+        if self._thread is None:
+            yield from self._decode()
+            return
+        
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            yield item
+        
+        if self._error is not None:
+            raise self._error
+    
+    def _decode(self) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (frame index, BGR frame) for every sampled frame"""
+        while not self._stop.is_set():
+            if self.end_frame is not None and self.frames_read >= self.end_frame:
+                break
+            
+            # Skip non-sampled frames without decoding them
+            if self.frames_read % self.frame_stride != 0:
+                if not self.cap.grab():
+                    break
+                self.frames_read += 1
+                continue
+            
+            slot = self._next_buffer
+            ret, frame = self.cap.read(self._buffers[slot])
+            if not ret:
+                break
+            
+            # The capture reallocates when the frame size changes; keep whatever it returned
+            self._buffers[slot] = frame
+            self._next_buffer = (slot + 1) % len(self._buffers)
+            
+            self.frames_read += 1
+            yield self.frames_read - 1, frame
+    
+    def _produce(self):
+        """Decoder thread: fill the bounded queue until the video ends or the reader is closed"""
+        try:
+            for item in self._decode():
+                while not self._stop.is_set():
+                    try:
+                        self._queue.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+        except Exception as e:
+            self._error = e
+        finally:
+            # End-of-stream marker; the consumer may already be gone
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(None, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+# Per-process analyzer used by segment workers
+_segment_analyzer = None
+
+def _init_segment_worker(analyzer_config: Dict):
+    """Build the worker's own MediaPipe graphs once per process"""
+    global _segment_analyzer
+    _segment_analyzer = VideoAnalyzer(**analyzer_config)
+
+def _analyze_segment(video_path: str, frame_stride: int, start_frame: int, end_frame: Optional[int],
+                     landmark_columns: List[int], signals: List[str],
+                     motion_gate: Optional[Tuple[float, int, int]] = None,
+                     face_schedule: Optional[Tuple[int, Optional[int]]] = None) -> Dict:
+    """Scan one time segment of a video in a worker process"""
+    # Segments are not contiguous with whatever this worker processed last
+    _segment_analyzer.pose.reset()
+    
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise Exception("Unable to open video file")
+    
+    return _segment_analyzer._scan_frames(cap, frame_stride, start_frame, end_frame, landmark_columns, signals,
+                                          motion_gate, face_schedule)
 
 class VideoAnalyzer:
     """Advanced video analysis using OpenCV and MediaPipe for sports assessment"""
     
-    def __init__(self):
+    def __init__(self, frame_stride: Optional[int] = None, frame_stride_scale: float = 1.0,
+                 model_complexity: int = 1, decode_queue_size: int = 4, stage_workers: int = 0,
+                 stage_processes: bool = False,
+                 segment_workers: int = 1, min_segment_seconds: float = 10.0,
+                 processing_long_side: Optional[int] = 960, quality_long_side: int = 320,
+                 face_checks_per_second: float = 2.0, face_detection_target: Optional[int] = 10,
+                 face_crop_from_pose: bool = True, pose_roi_tracking: bool = False,
+                 bounded_memory: bool = False, cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 proxy_long_side: Optional[int] = PROXY_LONG_SIDE, proxy_fps: float = PROXY_FPS,
+                 motion_gate_threshold: Optional[float] = None, still_pose_rate: float = 5.0,
+                 event_search_fps: Optional[float] = None):
+        # Fixed sampling stride; None selects the test spec's stride, scaled
+        self.frame_stride = frame_stride
+        self.frame_stride_scale = frame_stride_scale
+        
+        # Pose model tier: 0 = lite, 1 = full, 2 = heavy
+        self.model_complexity = model_complexity
+        
+        # Videos are transcoded at ingestion (``create_proxy``) into a constant-rate proxy of
+        # this long side, and analyses read the proxy when one exists. Analyses never wait
+        # for a transcode: without a proxy the original is read (None always reads it)
+        self.proxy_long_side = proxy_long_side
+        self.proxy_fps = proxy_fps
+        
+        # Frames are downscaled once to this long side for all stages (None keeps native size)
+        self.processing_long_side = processing_long_side
+        self.quality_long_side = quality_long_side
+        
+        # Face detection only verifies identity: run it at a low rate, stop after enough
+        # confident detections, and look only at the upper body when the pose is known
+        self.face_checks_per_second = face_checks_per_second
+        self.face_detection_target = face_detection_target
+        self.face_crop_from_pose = face_crop_from_pose
+        self.face_confidence_threshold = 0.8
+        
+        # On motion-gated tests pose runs on every sampled frame only while at least this
+        # fraction of a tiny greyscale thumbnail changed since the previous frame, and
+        # ``still_pose_rate`` times a second otherwise. Off (None) by default: 0.01
+        # separated a jump from standing on synthetic clips but is not validated on
+        # real footage yet
+        self.motion_gate_threshold = motion_gate_threshold
+        self.still_pose_rate = still_pose_rate
+        self.motion_gate_hold_seconds = 0.5
+        
+        # Two-pass event search for tests with event frames in their spec: pose is first
+        # sampled at this rate, then only the frames around the events found are scanned
+        # again at the test's stride (None scans the whole video at the test's stride)
+        self.event_search_fps = event_search_fps
+        
+        # Run pose on a padded crop around the previous frame's landmarks
+        self.pose_roi_tracking = pose_roi_tracking
+        self.roi_padding = 0.3
+        
+        # Frames buffered between the decoder thread and inference (0 decodes inline)
+        self.decode_queue_size = decode_queue_size
+        
+        # Threads running face detection and frame quality while pose runs on the same
+        # frame (0 runs the stages one after another)
+        self.stage_workers = stage_workers
+        self._stage_pool = None
+        
+        # Run decode, pose and quality/face as separate processes sharing frames through
+        # shared memory (see utils.stage_pipeline); their throughput of the last scan is
+        # kept in ``stage_throughput``
+        self.stage_processes = stage_processes
+        self._stage_pipeline = None
+        self.stage_throughput = {}
+        
+        # Keep running aggregates instead of per-frame quality and face records
+        self.bounded_memory = bounded_memory
+        
+        # Long videos are split into time segments analysed in parallel processes
+        self.segment_workers = segment_workers
+        self.min_segment_seconds = min_segment_seconds
+        self._segment_pool = None
+        
+        # Finished analyses are cached on disk by video content (None disables the cache)
+        self.landmark_cache = LandmarkCache(cache_dir) if cache_dir else None
+        
         # Initialize MediaPipe solutions
         self.mp_pose = mp.solutions.pose
         self.mp_drawing = mp.solutions.drawing_utils
+        self.landmark_ids = [self.mp_pose.PoseLandmark[name.upper()] for name in POSE_LANDMARK_NAMES]
         self.pose = self.mp_pose.Pose(
+            model_complexity=model_complexity,
             min_detection_confidence=0.7,
             min_tracking_confidence=0.5
         )
@@ -21,331 +555,986 @@ class VideoAnalyzer:
         self.face_detection = self.mp_face_detection.FaceDetection(
             model_selection=0, min_detection_confidence=0.5
         )
+    
+    @classmethod
+    def from_profile(cls, profile: str, **overrides) -> 'VideoAnalyzer':
+        """Build an analyzer from a named profile in ANALYZER_PROFILES"""
+        if profile not in ANALYZER_PROFILES:
+            raise ValueError(f"Unknown analyzer profile: {profile}")
+        
+        return cls(**{**ANALYZER_PROFILES[profile], **overrides})
+    
+    def get_config(self) -> Dict:
+        """Constructor arguments that reproduce this analyzer's processing settings"""
+        return {
+            'frame_stride': self.frame_stride,
+            'frame_stride_scale': self.frame_stride_scale,
+            'model_complexity': self.model_complexity,
+            'decode_queue_size': self.decode_queue_size,
+            'stage_workers': self.stage_workers,
+            'stage_processes': self.stage_processes,
+            'proxy_long_side': self.proxy_long_side,
+            'proxy_fps': self.proxy_fps,
+            'processing_long_side': self.processing_long_side,
+            'quality_long_side': self.quality_long_side,
+            'face_checks_per_second': self.face_checks_per_second,
+            'face_detection_target': self.face_detection_target,
+            'face_crop_from_pose': self.face_crop_from_pose,
+            'pose_roi_tracking': self.pose_roi_tracking,
+            'motion_gate_threshold': self.motion_gate_threshold,
+            'still_pose_rate': self.still_pose_rate,
+            'event_search_fps': self.event_search_fps,
+            'bounded_memory': self.bounded_memory
+        }
+    
+    def get_cache_version(self, test_type: Optional[str] = None, proxied: bool = True) -> str:
+        """Cache version for analyses of a test type; changes with any output-affecting setting"""
+        config = self.get_config()
+        config.pop('decode_queue_size')
+        config.pop('stage_processes')
+        if not proxied:
+            config['proxy_long_side'] = config['proxy_fps'] = None
+        config['frame_stride'] = self.get_frame_stride(test_type)
+        config['landmarks'] = landmarks_for_test(test_type)
+        config['signals'] = signals_for_test(test_type)
+        return config_version(config)
+    
+    def create_proxy(self, video_path: str) -> Optional[str]:
+        """
+        Write a video's analysis proxy ahead of analysis, e.g. when a batch ingests it
         
-    def analyze_video(self, video_path: str) -> Dict:
+        Returns:
+            Path of the proxy, or None when proxies are disabled or transcoding failed
+        """
+        if not self.proxy_long_side:
+            return None
+        return create_proxy_video(video_path, self.proxy_long_side, self.proxy_fps)
+    
+    def analyze_video(self, video_path: str, test_type: Optional[str] = None,
+                      video_hash: Optional[str] = None) -> Dict:
         """
         Comprehensive video analysis including pose estimation, frame quality, and motion detection
+        
+        The video is analysed through its constant-frame-rate proxy when one was
+        written by ``create_proxy``. Only every ``frame_stride``-th frame is decoded and processed, and on
+        motion-gated tests pose skips sampled frames while the athlete is still; the
+        landmark series is interpolated back to the full frame rate afterwards. With
+        ``event_search_fps`` set, timed tests are scanned coarsely first and at their
+        own stride only around the events. Results are served from the landmark cache
+        when this video was already analysed with the same settings.
+        """
+        for update in self.analyze_video_stream(video_path, test_type, video_hash):
+            pass
+        
+        return update['analysis']
+    
+    def analyze_video_stream(self, video_path: str, test_type: Optional[str] = None,
+                             video_hash: Optional[str] = None,
+                             progress_interval: float = 0.5) -> Iterator[Dict]:
         """
+        Analyse a video, yielding live progress while frames are processed
+        
+        Progress updates are dicts with ``type`` 'progress', ``frames_done``,
+        ``total_frames`` and ``progress`` (0-1), plus ``rep_count`` for repetition
+        tests or ``hip_height`` for the vertical jump. They are emitted after the
+        first sampled frame and then at most every ``progress_interval`` seconds.
+        The last item is ``{'type': 'result', 'analysis': ...}`` with the same
+        dict ``analyze_video`` returns.
+        """
+        self.stage_throughput = {}
+        
+        # Transcoding here would hold back the first progress item for the whole clip,
+        # so only a proxy written at ingestion is used
+        proxy_path = find_proxy_video(video_path, self.proxy_long_side, self.proxy_fps) if self.proxy_long_side else None
+        
+        if self.landmark_cache is not None:
+            video_hash = video_hash or compute_video_hash(video_path)
+            cache_version = self.get_cache_version(test_type, proxied=proxy_path is not None)
+            analysis = self.landmark_cache.load(video_hash, cache_version)
+            if analysis is not None:
+                yield {'type': 'result', 'analysis': analysis}
+                return
+        
         cap = cv2.VideoCapture(video_path)
         
         if not cap.isOpened():
             raise Exception("Unable to open video file")
         
+        # The upload's own resolution is reported; timing comes from the proxy
+        resolution = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        
+        if proxy_path is not None:
+            cap.release()
+            video_path = proxy_path
+            cap = cv2.VideoCapture(video_path)
+        
+        frame_stride = self.get_frame_stride(test_type)
+        
         analysis_data = {
             'total_frames': 0,
             'fps': cap.get(cv2.CAP_PROP_FPS),
             'duration': 0,
-            'resolution': (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 
-                          int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))),
-            'pose_detections': [],
+            'resolution': resolution,
+            'frame_stride': frame_stride,
+            'landmarks': np.empty((0, len(POSE_LANDMARK_NAMES), len(LANDMARK_FIELDS)), dtype=np.float32),
+            'landmark_index': dict(LANDMARK_INDEX),
+            'pose_frames': np.empty(0, dtype=np.int64),
             'frame_quality_scores': [],
-            'motion_intensity': [],
+            'motion_intensity': np.empty(0, dtype=np.float32),
             'face_detections': [],
             'key_movements': []
         }
         
-        frame_count = 0
-        pose_landmarks_history = []
+        # Coarse first pass of a two-pass event search, or the single pass at the test's stride
+        coarse_stride = self._event_search_stride(test_type, analysis_data['fps'], frame_stride)
+        scan_stride = coarse_stride or frame_stride
         
-        try:
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                frame_count += 1
-                
-                # Convert BGR to RGB for MediaPipe
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Pose detection
-                pose_results = self.pose.process(rgb_frame)
-                if pose_results.pose_landmarks:
-                    landmarks = self._extract_pose_landmarks(pose_results.pose_landmarks)
-                    analysis_data['pose_detections'].append(landmarks)
-                    pose_landmarks_history.append(landmarks)
-                
-                # Face detection for verification
-                face_results = self.face_detection.process(rgb_frame)
-                if face_results.detections:
-                    face_data = self._extract_face_data(face_results.detections)
-                    analysis_data['face_detections'].append(face_data)
-                
-                # Frame quality assessment
-                quality_score = self._assess_frame_quality(frame)
-                analysis_data['frame_quality_scores'].append(quality_score)
-                
-                # Motion intensity calculation
-                if frame_count > 1 and len(pose_landmarks_history) >= 2:
-                    motion = self._calculate_motion_intensity(
-                        pose_landmarks_history[-2], pose_landmarks_history[-1]
-                    )
-                    analysis_data['motion_intensity'].append(motion)
+        segments = self._plan_segments(cap, analysis_data['fps'])
+        frame_estimate = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        scan = self._new_scan(landmark_columns=self._landmark_columns(test_type),
+                              signals=signals_for_test(test_type),
+                              motion_gate=self._motion_gate_settings(test_type, analysis_data['fps'], scan_stride))
+        
+        if len(segments) > 1:
+            cap.release()
+            for frames_done in self._scan_segments(video_path, scan_stride, segments, scan,
+                                                   analysis_data['fps']):
+                yield self._progress_update(frames_done, frame_estimate)
+        elif self.stage_processes:
+            for frames_done in self._scan_stage_processes(video_path, cap, scan_stride, scan):
+                yield self._progress_update(frames_done, frame_estimate)
+        else:
+            live_state = {'in_rep': False, 'rep_count': 0}
+            last_update = None
+            
+            for frame_index, landmarks in self._scan_frames_stream(cap, scan_stride, scan):
+                live_metrics = self._update_live_metrics(live_state, test_type, landmarks)
                 
-                # Process every 5th frame to reduce computation
-                if frame_count % 5 != 0:
-                    continue
+                now = time.perf_counter()
+                if last_update is None or now - last_update >= progress_interval:
+                    last_update = now
+                    yield self._progress_update(frame_index + 1, frame_estimate, live_metrics)
+        
+        if coarse_stride:
+            analysis_data['event_windows'] = self._refine_events(video_path, test_type, analysis_data,
+                                                                 scan, frame_stride, coarse_stride)
+        
+        analysis = self._finalize_analysis(analysis_data, scan)
+        
+        if self.landmark_cache is not None:
+            self.landmark_cache.save(video_hash, cache_version, analysis)
+        
+        yield {'type': 'result', 'analysis': analysis}
+    
+    def _event_search_stride(self, test_type: Optional[str], fps: float, frame_stride: int) -> Optional[int]:
+        """Sampling stride of the coarse event-search pass, or None when the test is scanned in one pass"""
+        spec = get_test_spec(test_type)
+        if not self.event_search_fps or spec is None or not spec.get('event_frames') or fps <= 0:
+            return None
+        
+        coarse_stride = int(round(fps / self.event_search_fps))
+        return coarse_stride if coarse_stride > frame_stride else None
+    
+    def _refine_events(self, video_path: str, test_type: str, analysis_data: Dict, scan: Dict,
+                       frame_stride: int, coarse_stride: int) -> List[Tuple[int, int]]:
+        """
+        Second pass of the event search: locate the test's events in the coarse scan,
+        then seek to the frames around each one and swap in pose samples at the
+        test's own stride
+        
+        The clip's tail after the last coarse sample is re-scanned first, so the
+        series ends where a single pass at the test's stride ends it; metrics
+        measured against the last frame (the sprint finish) see the same end.
+        
+        Returns:
+            The re-scanned [start, end) frame windows
+        """
+        frames_read = scan['frames_read']
+        tail = (self._align_to_stride(max(frames_read - coarse_stride, 0), frame_stride), frames_read)
+        self._rescan_window(video_path, scan, frame_stride, *tail)
+        
+        coarse_analysis = self._finalize_analysis(dict(analysis_data), scan)
+        metrics = self.compute_movement_metrics(coarse_analysis, test_type)
+        if 'error' in metrics:
+            return [tail]
+        
+        # An event lies within one coarse step of where the coarse series puts it
+        events = sorted(metrics[key] for key in get_test_spec(test_type)['event_frames'] if key in metrics)
+        windows = []
+        for event in events:
+            start = self._align_to_stride(max(event - coarse_stride, 0), frame_stride)
+            end = min(event + coarse_stride + 1, tail[0])
+            if start >= end:
+                # Inside the tail, which is already re-scanned
+                continue
+            if windows and start <= windows[-1][1]:
+                windows[-1] = (windows[-1][0], max(windows[-1][1], end))
+            else:
+                windows.append((start, end))
+        
+        for start, end in windows:
+            self._rescan_window(video_path, scan, frame_stride, start, end)
+        
+        return windows + [tail]
+    
+    def _rescan_window(self, video_path: str, scan: Dict, frame_stride: int, start: int, end: int):
+        """Swap a scan's pose samples in frames [start, end) for a pose-only scan at ``frame_stride``"""
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise Exception("Unable to open video file")
+        
+        # The window is not contiguous with the frames pose tracked last
+        self.pose.reset()
+        window_scan = self._scan_pose_window(cap, frame_stride, start, end, scan['landmark_columns'])
+        self._merge_window_scan(scan, window_scan, start, end)
+    
+    def _align_to_stride(self, frame: int, frame_stride: int) -> int:
+        """Latest frame at or before ``frame`` that a single pass at ``frame_stride`` samples"""
+        return frame - frame % frame_stride
+    
+    def _merge_window_scan(self, scan: Dict, window_scan: Dict, start: int, end: int):
+        """Replace a scan's pose samples in frames [start, end) with those of a finer window scan"""
+        samples = [(frame, landmarks) for frame, landmarks in zip(scan['pose_frames'], scan['pose_landmarks'])
+                   if not start <= frame < end]
+        samples.extend(zip(window_scan['pose_frames'], window_scan['pose_landmarks']))
+        samples.sort(key=lambda sample: sample[0])
+        
+        scan['pose_frames'] = [frame for frame, _ in samples]
+        scan['pose_landmarks'] = [landmarks for _, landmarks in samples]
+        scan['missed_pose_frames'] = sorted([frame for frame in scan['missed_pose_frames'] if not start <= frame < end] +
+                                            window_scan['missed_pose_frames'])
+    
+    def _scan_pose_window(self, cap: cv2.VideoCapture, frame_stride: int, start_frame: int, end_frame: int,
+                          landmark_columns: List[int]) -> Dict:
+        """
+        Pose-only scan of frames [start_frame, end_frame) for the event search
+        
+        Face checks and frame quality already came from the coarse pass, so the
+        window runs pose alone and its frames are not counted as sampled again.
+        """
+        scan = self._new_scan(start_frame, landmark_columns, signals=[])
+        buffers = FrameBuffers()
+        pose_roi = None
+        
+        frame_index = start_frame
+        reader = FrameReader(cap, frame_stride, self.decode_queue_size, start_frame, end_frame)
+        
+        try:
+            with reader:
+                for frame_index, frame in reader:
+                    frame = self._resize_to_long_side(frame, self.processing_long_side, buffers, 'processed')
                     
+                    rgb_frame = buffers.get('rgb', frame.shape)
+                    rgb_frame.flags.writeable = True
+                    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_frame)
+                    rgb_frame.flags.writeable = False
+                    
+                    landmarks, pose_roi = self._detect_pose(rgb_frame, pose_roi)
+                    self._record_pose(scan, frame_index, landmarks)
+        
         except Exception as e:
-            logging.error(f"Error processing frame {frame_count}: {str(e)}")
+            logging.error(f"Error processing frame {frame_index}: {str(e)}")
+        
+        finally:
+            cap.release()
+        
+        scan['frames_read'] = reader.frames_read
+        return scan
+    
+    def _progress_update(self, frames_done: int, frame_estimate: int,
+                         live_metrics: Optional[Dict] = None) -> Dict:
+        """Progress item of the analysis stream"""
+        update = {
+            'type': 'progress',
+            'frames_done': frames_done,
+            'total_frames': frame_estimate,
+            'progress': min(frames_done / frame_estimate, 1.0) if frame_estimate > 0 else 0.0
+        }
+        update.update(live_metrics or {})
+        return update
+    
+    def _update_live_metrics(self, state: Dict, test_type: Optional[str],
+                             landmarks: Optional[np.ndarray]) -> Dict:
+        """Running value of the test spec's live metric from the latest sampled frame"""
+        live_metric = (get_test_spec(test_type) or {}).get('live_metric')
+        
+        if live_metric == 'rep_count':
+            if landmarks is not None:
+                angle_signal, enter_below, exit_above = get_test_spec(test_type)['rep_angle']
+                angle = bilateral_joint_angles(landmarks[None], LANDMARK_INDEX, JOINT_ANGLES[angle_signal])[0]
+                
+                if angle < enter_below and not state['in_rep']:
+                    state['in_rep'] = True
+                elif angle > exit_above and state['in_rep']:
+                    state['in_rep'] = False
+                    state['rep_count'] += 1
             
+            return {'rep_count': state['rep_count']}
+        
+        if live_metric == 'hip_height' and landmarks is not None:
+            avg_hip_y = (landmarks[LANDMARK_INDEX['left_hip'], 1] + landmarks[LANDMARK_INDEX['right_hip'], 1]) / 2
+            state['hip_height'] = float(1.0 - avg_hip_y)
+        
+        return {'hip_height': state['hip_height']} if 'hip_height' in state else {}
+    
+    def _plan_segments(self, cap: cv2.VideoCapture, fps: float) -> List[Tuple[int, Optional[int]]]:
+        """Split a long video into (start_frame, end_frame) segments, one per worker"""
+        frame_total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if self.segment_workers <= 1 or fps <= 0 or frame_total <= 0:
+            return [(0, None)]
+        
+        segment_count = min(self.segment_workers, int(frame_total / fps // self.min_segment_seconds))
+        if segment_count <= 1:
+            return [(0, None)]
+        
+        bounds = np.linspace(0, frame_total, segment_count + 1).astype(int)
+        segments = [(int(start), int(end)) for start, end in zip(bounds[:-1], bounds[1:])]
+        
+        # The container frame count can be off; let the last segment read to the end
+        segments[-1] = (segments[-1][0], None)
+        return segments
+    
+    def _scan_segments(self, video_path: str, frame_stride: int,
+                       segments: List[Tuple[int, Optional[int]]], scan: Dict, fps: float) -> Iterator[int]:
+        """
+        Scan segments in the process pool and stitch the per-frame series back into ``scan``
+        
+        Yields the number of frames finished each time a segment completes.
+        """
+        if self._segment_pool is None:
+            # Spawned workers avoid inheriting MediaPipe graph state through fork
+            self._segment_pool = ProcessPoolExecutor(
+                max_workers=self.segment_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_segment_worker,
+                initargs=({**self.get_config(), 'segment_workers': 1, 'cache_dir': None},)
+            )
+        
+        face_schedules = self._segment_face_schedules(segments, frame_stride, fps)
+        futures = [
+            self._segment_pool.submit(_analyze_segment, video_path, frame_stride, start, end,
+                                      scan['landmark_columns'], scan['signals'], scan['motion_gate'],
+                                      face_schedule)
+            for (start, end), face_schedule in zip(segments, face_schedules)
+        ]
+        
+        frames_done = 0
+        for future in as_completed(futures):
+            segment_scan = future.result()
+            start_frame = segments[futures.index(future)][0]
+            frames_done += segment_scan['frames_read'] - start_frame
+            yield frames_done
+        
+        # Stitch in time order regardless of completion order
+        for future in futures:
+            segment_scan = future.result()
+            scan['frames_read'] = max(scan['frames_read'], segment_scan['frames_read'])
+            for key in ['sampled_frames', 'face_checks', 'confident_faces', 'face_frames', 'multiple_face_frames']:
+                scan[key] += segment_scan[key]
+            for key in ['quality_stats', 'visibility_stats', 'face_confidence_stats']:
+                scan[key].merge(segment_scan[key])
+            for key in ['pose_frames', 'pose_landmarks', 'missed_pose_frames', 'face_detections', 'frame_quality_scores']:
+                scan[key].extend(segment_scan[key])
+    
+    def _segment_face_schedules(self, segments: List[Tuple[int, Optional[int]]], frame_stride: int,
+                                fps: float) -> List[Tuple[int, Optional[int]]]:
+        """
+        (first face frame, confident-face target) of each segment, so segments
+        together check faces as often as a single pass would
+        """
+        # A single pass checks faces on the first sampled frame at or after each interval,
+        # which is every face interval rounded up to whole strides
+        face_period = -(-self._face_interval(fps) // frame_stride) * frame_stride
+        first_frames = [-(-start // face_period) * face_period for start, _ in segments]
+        
+        # Split the confident-face target so the segments stop at the same total
+        if self.face_detection_target is None:
+            return [(first_frame, None) for first_frame in first_frames]
+        shares = np.diff(np.linspace(0, self.face_detection_target, len(segments) + 1).round()).astype(int)
+        return [(first_frame, int(share)) for first_frame, share in zip(first_frames, shares)]
+    
+    def _scan_stage_processes(self, video_path: str, cap: cv2.VideoCapture, frame_stride: int,
+                              scan: Dict) -> Iterator[int]:
+        """Scan a video through the decode, pose and quality/face processes, yielding frames done"""
+        if self._stage_pipeline is None:
+            self._stage_pipeline = StagePipeline(self.get_config())
+        
+        width, height = self._scaled_size(int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                                          int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), self.processing_long_side)
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        cap.release()
+        
+        yield from self._stage_pipeline.scan(video_path, frame_stride, scan, (height, width, 3), fps)
+        self.stage_throughput = self._stage_pipeline.stage_stats
+    
+    def _new_scan(self, start_frame: int = 0, landmark_columns: Optional[List[int]] = None,
+                  signals: Optional[List[str]] = None,
+                  motion_gate: Optional[Tuple[float, int, int]] = None,
+                  face_schedule: Optional[Tuple[int, Optional[int]]] = None) -> Dict:
+        """Empty accumulator for the per-frame outputs of a scan"""
+        landmark_columns = landmark_columns or list(range(len(POSE_LANDMARK_NAMES)))
+        first_face_frame, face_detection_target = face_schedule or (start_frame, self.face_detection_target)
+        return {
+            'frames_read': start_frame,
+            'sampled_frames': 0,
+            'landmark_columns': landmark_columns,
+            'signals': signals_for_test(None) if signals is None else signals,
+            # MotionGate arguments, or None to run pose on every sampled frame
+            'motion_gate': motion_gate,
+            # First frame due a face check, and confident faces after which checks stop
+            'first_face_frame': first_face_frame,
+            'face_detection_target': face_detection_target,
+            'pose_frames': [],
+            'pose_landmarks': [],
+            # Frames where pose ran and found nobody; interpolation does not bridge them
+            'missed_pose_frames': [],
+            'visibility_stats': RunningStats(),
+            'face_detections': [],
+            'face_checks': 0,
+            'face_frames': 0,
+            'multiple_face_frames': 0,
+            'confident_faces': 0,
+            'face_confidence_stats': RunningStats(),
+            'frame_quality_scores': [],
+            'quality_stats': RunningStats()
+        }
+    
+    def _motion_gate_settings(self, test_type: Optional[str], fps: float,
+                              frame_stride: int) -> Optional[Tuple[float, int, int]]:
+        """MotionGate (threshold, still interval, hold frames) for a test, or None when it is not gated"""
+        spec = get_test_spec(test_type)
+        if self.motion_gate_threshold is None or spec is None or not spec.get('motion_gated') or fps <= 0:
+            return None
+        
+        sample_rate = fps / frame_stride
+        still_interval = max(int(round(sample_rate / self.still_pose_rate)), 1) if self.still_pose_rate > 0 else 1
+        hold_frames = int(round(self.motion_gate_hold_seconds * sample_rate))
+        return (self.motion_gate_threshold, still_interval, hold_frames)
+    
+    def _landmark_columns(self, test_type: Optional[str]) -> List[int]:
+        """Landmark tensor columns kept for a test"""
+        kept = landmarks_for_test(test_type)
+        if kept is None:
+            return list(range(len(POSE_LANDMARK_NAMES)))
+        
+        return [column for column, name in enumerate(POSE_LANDMARK_NAMES) if name in kept]
+    
+    def _scan_frames(self, cap: cv2.VideoCapture, frame_stride: int,
+                     start_frame: int = 0, end_frame: Optional[int] = None,
+                     landmark_columns: Optional[List[int]] = None,
+                     signals: Optional[List[str]] = None,
+                     motion_gate: Optional[Tuple[float, int, int]] = None,
+                     face_schedule: Optional[Tuple[int, Optional[int]]] = None) -> Dict:
+        """Run pose, face and quality analysis over the sampled frames of a capture"""
+        scan = self._new_scan(start_frame, landmark_columns, signals, motion_gate, face_schedule)
+        for _ in self._scan_frames_stream(cap, frame_stride, scan, start_frame, end_frame):
+            pass
+        
+        return scan
+    
+    def _scan_frames_stream(self, cap: cv2.VideoCapture, frame_stride: int, scan: Dict,
+                            start_frame: int = 0,
+                            end_frame: Optional[int] = None) -> Iterator[Tuple[int, Optional[np.ndarray]]]:
+        """
+        Accumulate the scan of a capture into ``scan``, yielding each sampled
+        frame's index and pose landmarks (None when no pose was found or the
+        motion gate skipped pose on the frame)
+        """
+        # Face detection schedule in native frames
+        face_interval = self._face_interval(cap.get(cv2.CAP_PROP_FPS))
+        next_face_frame = scan['first_face_frame']
+        
+        pose_roi = None
+        # Latest pose result, used for face crops
+        last_landmarks = None
+        gate = MotionGate(*scan['motion_gate']) if scan['motion_gate'] else None
+        
+        # Per-stage destination arrays, reused for every frame of this scan
+        buffers = FrameBuffers()
+        
+        if self.stage_workers > 0 and self._stage_pool is None:
+            self._stage_pool = ThreadPoolExecutor(max_workers=self.stage_workers,
+                                                  thread_name_prefix='analysis-stage')
+        
+        frame_index = start_frame
+        reader = FrameReader(cap, frame_stride, self.decode_queue_size, start_frame, end_frame)
+        
+        try:
+            with reader:
+                for frame_index, frame in reader:
+                    scan['sampled_frames'] += 1
+                    
+                    # Single downscale shared by every stage; landmarks stay normalised
+                    frame = self._resize_to_long_side(frame, self.processing_long_side, buffers, 'processed')
+                    
+                    # Convert BGR to RGB for MediaPipe; read-only input is passed without a copy
+                    rgb_frame = buffers.get('rgb', frame.shape)
+                    rgb_frame.flags.writeable = True
+                    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_frame)
+                    rgb_frame.flags.writeable = False
+                    
+                    # Motion gate: pose runs on still frames only at the reduced rate
+                    pose_due = gate is None or gate.pose_due(frame)
+                    
+                    # Scheduled face detection for verification
+                    face_due = frame_index >= next_face_frame and not self._face_target_reached(scan)
+                    if face_due:
+                        next_face_frame = frame_index + face_interval
+                        scan['face_checks'] += 1
+                    
+                    # Stage threads take quality and face detection while pose runs here; OpenCV
+                    # and MediaPipe release the GIL. The face crop then comes from the previous
+                    # pose sample, since this frame's pose is not known yet.
+                    quality_job = face_job = None
+                    if self._stage_pool is not None:
+                        quality_job = self._stage_pool.submit(self._frame_quality, frame, buffers)
+                        if face_due:
+                            face_job = self._stage_pool.submit(self._detect_faces, rgb_frame, last_landmarks)
+                    
+                    # Pose detection; still frames between gated samples are interpolated later
+                    landmarks = None
+                    if pose_due:
+                        landmarks, pose_roi = self._detect_pose(rgb_frame, pose_roi)
+                        last_landmarks = landmarks
+                        self._record_pose(scan, frame_index, landmarks)
+                    
+                    # Join the stages before the frame buffers are reused for the next frame
+                    if face_due:
+                        face_data = face_job.result() if face_job is not None else self._detect_faces(rgb_frame, last_landmarks)
+                        self._record_faces(scan, face_data)
+                    
+                    quality_score = quality_job.result() if quality_job is not None else self._frame_quality(frame, buffers)
+                    self._record_quality(scan, quality_score)
+                    
+                    yield frame_index, landmarks
+                
+                # End the series on a pose run so a still tail is interpolated too
+                if gate is not None and scan['sampled_frames'] > 0 and not pose_due:
+                    landmarks, pose_roi = self._detect_pose(rgb_frame, pose_roi)
+                    self._record_pose(scan, frame_index, landmarks)
+        
+        except Exception as e:
+            logging.error(f"Error processing frame {frame_index}: {str(e)}")
+        
         finally:
             cap.release()
         
+        scan['frames_read'] = reader.frames_read
+    
+    def _face_interval(self, fps: float) -> int:
+        """Native frames between scheduled face checks"""
+        if fps > 0 and self.face_checks_per_second > 0:
+            return max(int(round(fps / self.face_checks_per_second)), 1)
+        return 1
+    
+    def _face_target_reached(self, scan: Dict) -> bool:
+        """Whether the scan has enough confident faces to stop face checks"""
+        return (scan['face_detection_target'] is not None and
+                scan['confident_faces'] >= scan['face_detection_target'])
+    
+    def _record_pose(self, scan: Dict, frame_index: int, landmarks: Optional[np.ndarray]):
+        """Add the result of one pose run to a scan"""
+        if landmarks is None:
+            scan['missed_pose_frames'].append(frame_index)
+            return
+        
+        scan['pose_frames'].append(frame_index)
+        scan['pose_landmarks'].append(landmarks[scan['landmark_columns']])
+        # Over all key landmarks whatever the test keeps; the cheat detector's
+        # visibility threshold is set for this fixed set
+        scan['visibility_stats'].update(float(np.mean(landmarks[:, 3])))
+    
+    def _record_faces(self, scan: Dict, face_data: List[Dict]):
+        """Add one face check's detections to a scan"""
+        if not face_data:
+            return
+        
+        confidence = max(face['confidence'] for face in face_data)
+        scan['face_frames'] += 1
+        scan['face_confidence_stats'].update(confidence)
+        if len(face_data) > 1:
+            scan['multiple_face_frames'] += 1
+        if not self.bounded_memory:
+            scan['face_detections'].append(face_data)
+        if confidence >= self.face_confidence_threshold:
+            scan['confident_faces'] += 1
+    
+    def _record_quality(self, scan: Dict, quality_score: float):
+        """Add one sampled frame's quality score to a scan"""
+        scan['quality_stats'].update(quality_score)
+        if not self.bounded_memory:
+            scan['frame_quality_scores'].append(quality_score)
+    
+    def _resize_to_long_side(self, frame: np.ndarray, long_side: Optional[int],
+                             buffers: Optional[FrameBuffers] = None, name: str = 'resized') -> np.ndarray:
+        """Downscale a frame so its longer side is at most ``long_side`` pixels, into ``buffers[name]`` if given"""
+        height, width = frame.shape[:2]
+        size = self._scaled_size(width, height, long_side)
+        if size == (width, height):
+            return frame
+        
+        dst = buffers.get(name, (size[1], size[0]) + frame.shape[2:]) if buffers is not None else None
+        return cv2.resize(frame, size, dst=dst, interpolation=cv2.INTER_AREA)
+    
+    def _scaled_size(self, width: int, height: int, long_side: Optional[int]) -> Tuple[int, int]:
+        """(width, height) after downscaling so the longer side is at most ``long_side``"""
+        if not long_side or max(height, width) <= long_side:
+            return width, height
+        
+        scale = long_side / max(height, width)
+        return max(int(round(width * scale)), 1), max(int(round(height * scale)), 1)
+    
+    def _finalize_analysis(self, analysis_data: Dict, scan: Dict) -> Dict:
+        """Derive the native-rate landmark series, motion and summary metrics from a frame scan"""
+        frame_count = scan['frames_read']
+        sampled_frames = scan['sampled_frames']
+        analysis_data['face_detections'] = scan['face_detections']
+        analysis_data['face_summary'] = self._summarize_faces(scan)
+        analysis_data['frame_quality_scores'] = scan['frame_quality_scores']
+        analysis_data['frame_quality_stats'] = scan['quality_stats'].to_dict()
+        analysis_data['visibility_stats'] = scan['visibility_stats'].to_dict()
+        
+        # Rebuild the landmark series at the native frame rate
+        columns = scan['landmark_columns']
+        sampled_landmarks = (np.stack(scan['pose_landmarks']) if scan['pose_landmarks'] else
+                             np.empty((0, len(columns), len(LANDMARK_FIELDS)), dtype=np.float32))
+        pose_frames, landmarks = self._interpolate_landmarks(
+            np.asarray(scan['pose_frames'], dtype=np.int64), sampled_landmarks,
+            np.asarray(scan['missed_pose_frames'], dtype=np.int64)
+        )
+        analysis_data['landmarks'] = landmarks
+        analysis_data['landmark_index'] = {POSE_LANDMARK_NAMES[column]: i for i, column in enumerate(columns)}
+        analysis_data['pose_frames'] = pose_frames
+        
+        # Motion intensity between consecutive frames of the landmark series
+        if 'motion' in scan['signals']:
+            analysis_data['motion_intensity'] = self._calculate_motion_intensity(landmarks, analysis_data['landmark_index'])
+        
         # Calculate derived metrics
         analysis_data['total_frames'] = frame_count
+        analysis_data['sampled_frames'] = sampled_frames
         analysis_data['duration'] = frame_count / analysis_data['fps'] if analysis_data['fps'] > 0 else 0
-        analysis_data['pose_detection_rate'] = len(analysis_data['pose_detections']) / frame_count if frame_count > 0 else 0
-        analysis_data['average_frame_quality'] = np.mean(analysis_data['frame_quality_scores']) if analysis_data['frame_quality_scores'] else 0
-        analysis_data['average_motion_intensity'] = np.mean(analysis_data['motion_intensity']) if analysis_data['motion_intensity'] else 0
+        # Detection rate over the frames pose ran on; gated-out still frames do not count
+        pose_runs = len(scan['pose_frames']) + len(scan['missed_pose_frames'])
+        analysis_data['pose_runs'] = pose_runs
+        analysis_data['pose_detection_rate'] = len(scan['pose_frames']) / pose_runs if pose_runs > 0 else 0
+        analysis_data['average_frame_quality'] = analysis_data['frame_quality_stats']['mean']
+        analysis_data['average_motion_intensity'] = float(np.mean(analysis_data['motion_intensity'])) if len(analysis_data['motion_intensity']) else 0
         
-        # Detect key movement phases
-        analysis_data['key_movements'] = self._detect_movement_phases(pose_landmarks_history)
+        # Detect key movement phases over the stitched series
+        if 'movement_phases' in scan['signals']:
+            analysis_data['key_movements'] = self._detect_movement_phases(analysis_data['motion_intensity'])
         
         return analysis_data
     
-    def _extract_pose_landmarks(self, landmarks) -> Dict:
-        """Extract key pose landmarks for analysis"""
-        landmark_dict = {}
-        
-        # Key landmarks for fitness assessment
-        key_landmarks = {
-            'nose': self.mp_pose.PoseLandmark.NOSE,
-            'left_shoulder': self.mp_pose.PoseLandmark.LEFT_SHOULDER,
-            'right_shoulder': self.mp_pose.PoseLandmark.RIGHT_SHOULDER,
-            'left_elbow': self.mp_pose.PoseLandmark.LEFT_ELBOW,
-            'right_elbow': self.mp_pose.PoseLandmark.RIGHT_ELBOW,
-            'left_wrist': self.mp_pose.PoseLandmark.LEFT_WRIST,
-            'right_wrist': self.mp_pose.PoseLandmark.RIGHT_WRIST,
-            'left_hip': self.mp_pose.PoseLandmark.LEFT_HIP,
-            'right_hip': self.mp_pose.PoseLandmark.RIGHT_HIP,
-            'left_knee': self.mp_pose.PoseLandmark.LEFT_KNEE,
-            'right_knee': self.mp_pose.PoseLandmark.RIGHT_KNEE,
-            'left_ankle': self.mp_pose.PoseLandmark.LEFT_ANKLE,
-            'right_ankle': self.mp_pose.PoseLandmark.RIGHT_ANKLE
-        }
+    def get_frame_stride(self, test_type: Optional[str] = None) -> int:
+        """Sampling stride used for a test type"""
+        if self.frame_stride is not None:
+            return max(int(self.frame_stride), 1)
+        spec = get_test_spec(test_type)
+        base_stride = spec['frame_stride'] if spec is not None else 1
+        return max(int(round(base_stride * self.frame_stride_scale)), 1)
+    
+    def _interpolate_landmarks(self, frames: np.ndarray, landmarks: np.ndarray,
+                               missed_frames: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Linearly interpolate sampled landmarks onto every native frame between samples"""
+        if len(frames) < 2:
+            return frames, landmarks
+        
+        # Only fill gaps left by the sampling stride or the motion gate; a gap holding a
+        # pose run that found nobody is a missed detection
+        starts, ends = frames[:-1], frames[1:]
+        bridged = ((np.searchsorted(missed_frames, starts, side='right') ==
+                    np.searchsorted(missed_frames, ends, side='left')) & (ends - starts > 1))
+        if not bridged.any():
+            return frames, landmarks
+        
+        target_frames = [frames]
+        for start, end in zip(starts[bridged], ends[bridged]):
+            target_frames.append(np.arange(start + 1, end))
+        target_frames = np.unique(np.concatenate(target_frames))
+        
+        flat_values = landmarks.reshape(len(frames), -1)
+        interpolated = np.empty((len(target_frames), flat_values.shape[1]), dtype=np.float32)
+        for column in range(flat_values.shape[1]):
+            interpolated[:, column] = np.interp(target_frames, frames, flat_values[:, column])
+        
+        return target_frames, interpolated.reshape((len(target_frames),) + landmarks.shape[1:])
+    
+    def _detect_pose(self, rgb_frame: np.ndarray,
+                     roi: Optional[Tuple[float, float, float, float]] = None) -> Tuple[Optional[np.ndarray], Optional[Tuple]]:
+        """Run pose on the tracked region of interest, falling back to the full frame when tracking is lost"""
+        landmarks = None
+        
+        if self.pose_roi_tracking and roi is not None:
+            landmarks = self._process_pose(rgb_frame, roi)
+        
+        if landmarks is None:
+            landmarks = self._process_pose(rgb_frame)
+            roi = None
+        
+        if self.pose_roi_tracking and landmarks is not None:
+            roi = self._track_pose_roi(roi, landmarks)
+        
+        return landmarks, roi
+    
+    def _process_pose(self, rgb_frame: np.ndarray,
+                      roi: Optional[Tuple[float, float, float, float]] = None) -> Optional[np.ndarray]:
+        """Run MediaPipe pose on the frame or a normalised (x0, y0, x1, y1) crop of it"""
+        if roi is None:
+            pose_results = self.pose.process(rgb_frame)
+            crop = (0.0, 0.0, 1.0, 1.0)
+        else:
+            height, width = rgb_frame.shape[:2]
+            x0, y0 = int(roi[0] * width), int(roi[1] * height)
+            x1, y1 = max(int(roi[2] * width), x0 + 1), max(int(roi[3] * height), y0 + 1)
+            pose_results = self.pose.process(_readonly_crop(rgb_frame, x0, y0, x1, y1))
+            crop = (x0 / width, y0 / height, x1 / width, y1 / height)
+        
+        if not pose_results.pose_landmarks:
+            return None
+        
+        return self._extract_pose_landmarks(pose_results.pose_landmarks, crop)
+    
+    def _track_pose_roi(self, roi: Optional[Tuple[float, float, float, float]],
+                        landmarks: np.ndarray) -> Tuple[float, float, float, float]:
+        """Keep the current crop while the body stays well inside it, otherwise re-centre it"""
+        x_min, y_min = landmarks[:, :2].min(axis=0)
+        x_max, y_max = landmarks[:, :2].max(axis=0)
+        
+        if roi is not None:
+            margin_x = (roi[2] - roi[0]) * 0.1
+            margin_y = (roi[3] - roi[1]) * 0.1
+            inside = (x_min > roi[0] + margin_x and x_max < roi[2] - margin_x and
+                      y_min > roi[1] + margin_y and y_max < roi[3] - margin_y)
+            # Re-crop when the body has shrunk to a small part of the crop as well
+            filled = (x_max - x_min) * (y_max - y_min) > 0.2 * (roi[2] - roi[0]) * (roi[3] - roi[1])
+            if inside and filled:
+                return roi
+        
+        pad = max(x_max - x_min, y_max - y_min, 0.1) * self.roi_padding
+        return (float(np.clip(x_min - pad, 0, 1)), float(np.clip(y_min - pad, 0, 1)),
+                float(np.clip(x_max + pad, 0, 1)), float(np.clip(y_max + pad, 0, 1)))
+    
+    def _extract_pose_landmarks(self, landmarks,
+                                crop: Tuple[float, float, float, float] = (0.0, 0.0, 1.0, 1.0)) -> np.ndarray:
+        """Extract key pose landmarks as a (landmarks, 4) x/y/z/visibility array in full-frame coordinates"""
+        landmark_array = np.empty((len(self.landmark_ids), len(LANDMARK_FIELDS)), dtype=np.float32)
         
-        for name, landmark_id in key_landmarks.items():
+        for i, landmark_id in enumerate(self.landmark_ids):
             landmark = landmarks.landmark[landmark_id]
-            landmark_dict[name] = {
-                'x': landmark.x,
-                'y': landmark.y,
-                'z': landmark.z,
-                'visibility': landmark.visibility
-            }
+            landmark_array[i] = (landmark.x, landmark.y, landmark.z, landmark.visibility)
+        
+        # Remap crop-relative coordinates; z shares the x scale
+        crop_width = crop[2] - crop[0]
+        crop_height = crop[3] - crop[1]
+        if crop_width < 1.0 or crop_height < 1.0:
+            landmark_array[:, 0] = crop[0] + landmark_array[:, 0] * crop_width
+            landmark_array[:, 1] = crop[1] + landmark_array[:, 1] * crop_height
+            landmark_array[:, 2] *= crop_width
         
-        return landmark_dict
+        return landmark_array
     
-    def _extract_face_data(self, detections) -> Dict:
-        """Extract face detection data for verification"""
+    def _detect_faces(self, rgb_frame: np.ndarray, landmarks: Optional[np.ndarray] = None) -> List[Dict]:
+        """Run face detection, on an upper-body crop when pose landmarks are available"""
+        crop = (0.0, 0.0, 1.0, 1.0)
+        if self.face_crop_from_pose and landmarks is not None:
+            crop = self._upper_body_crop(landmarks)
+        
+        height, width = rgb_frame.shape[:2]
+        x0, y0 = int(crop[0] * width), int(crop[1] * height)
+        x1, y1 = max(int(crop[2] * width), x0 + 1), max(int(crop[3] * height), y0 + 1)
+        
+        face_results = self.face_detection.process(_readonly_crop(rgb_frame, x0, y0, x1, y1))
+        if not face_results.detections:
+            return []
+        
+        return self._extract_face_data(face_results.detections, crop)
+    
+    def _upper_body_crop(self, landmarks: np.ndarray) -> Tuple[float, float, float, float]:
+        """Normalised (x0, y0, x1, y1) box around the head and shoulders"""
+        points = landmarks[[LANDMARK_INDEX['nose'], LANDMARK_INDEX['left_shoulder'],
+                            LANDMARK_INDEX['right_shoulder']], :2]
+        x_min, y_min = points.min(axis=0)
+        x_max, y_max = points.max(axis=0)
+        
+        # Pad generously: the nose-to-shoulder box does not contain the whole head
+        size = max(x_max - x_min, y_max - y_min, 0.1)
+        return (float(np.clip(x_min - size * 0.5, 0, 1)), float(np.clip(y_min - size, 0, 1)),
+                float(np.clip(x_max + size * 0.5, 0, 1)), float(np.clip(y_max + size * 0.25, 0, 1)))
+    
+    def _extract_face_data(self, detections, crop: Tuple[float, float, float, float] = (0.0, 0.0, 1.0, 1.0)) -> List[Dict]:
+        """Extract face detection data for verification, in full-frame normalised coordinates"""
         face_data = []
+        crop_width = crop[2] - crop[0]
+        crop_height = crop[3] - crop[1]
         
         for detection in detections:
             bbox = detection.location_data.relative_bounding_box
             face_data.append({
                 'confidence': detection.score[0],
                 'bbox': {
-                    'x': bbox.xmin,
-                    'y': bbox.ymin,
-                    'width': bbox.width,
-                    'height': bbox.height
+                    'x': crop[0] + bbox.xmin * crop_width,
+                    'y': crop[1] + bbox.ymin * crop_height,
+                    'width': bbox.width * crop_width,
+                    'height': bbox.height * crop_height
                 }
             })
         
         return face_data
     
-    def _assess_frame_quality(self, frame: np.ndarray) -> float:
+    def _summarize_faces(self, scan: Dict) -> Dict:
+        """Aggregate face statistics used for identity verification"""
+        face_checks = scan['face_checks']
+        
+        return {
+            'frames_checked': face_checks,
+            'frames_with_face': scan['face_frames'],
+            'detection_rate': scan['face_frames'] / face_checks if face_checks > 0 else 0,
+            'average_confidence': scan['face_confidence_stats'].mean,
+            'multiple_face_frames': scan['multiple_face_frames']
+        }
+    
+    def _frame_quality(self, frame: np.ndarray, buffers: FrameBuffers,
+                       gray_conversion: int = cv2.COLOR_BGR2GRAY) -> float:
+        """Frame quality assessment on a thumbnail"""
+        thumbnail = self._resize_to_long_side(frame, self.quality_long_side, buffers, 'thumbnail')
+        return self._assess_frame_quality(thumbnail, buffers, gray_conversion)
+    
+    def _assess_frame_quality(self, frame: np.ndarray, buffers: Optional[FrameBuffers] = None,
+                              gray_conversion: int = cv2.COLOR_BGR2GRAY) -> float:
         """Assess frame quality using multiple metrics"""
         # Convert to grayscale for analysis
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = cv2.cvtColor(frame, gray_conversion,
+                            dst=buffers.get('gray', frame.shape[:2]) if buffers is not None else None)
         
-        # Sharpness using Laplacian variance
-        laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
+        # Sharpness using Laplacian variance; the 3x3 Laplacian of 8-bit input fits in int16 exactly
+        laplacian = cv2.Laplacian(gray, cv2.CV_16S,
+                                  dst=buffers.get('laplacian', gray.shape, np.int16) if buffers is not None else None)
+        laplacian_var = float(cv2.meanStdDev(laplacian)[1][0, 0]) ** 2
         sharpness_score = min(laplacian_var / 1000.0, 1.0)  # Normalize
         
-        # Brightness assessment
-        mean_brightness = np.mean(gray)
+        # Brightness and contrast from one pass over the grey levels
+        mean, std = cv2.meanStdDev(gray)
+        mean_brightness = float(mean[0, 0])
         brightness_score = 1.0 - abs(mean_brightness - 128) / 128.0  # Optimal around 128
         
         # Contrast assessment
-        contrast_score = np.std(gray) / 255.0
+        contrast_score = float(std[0, 0]) / 255.0
         
         # Combined quality score
         quality_score = (sharpness_score * 0.4 + brightness_score * 0.3 + contrast_score * 0.3)
         
         return min(quality_score, 1.0)
     
-    def _calculate_motion_intensity(self, landmarks1: Dict, landmarks2: Dict) -> float:
-        """Calculate motion intensity between two frames"""
-        if not landmarks1 or not landmarks2:
-            return 0.0
-        
-        total_movement = 0.0
-        landmark_count = 0
-        
-        # Calculate movement for key body points
-        key_points = ['left_shoulder', 'right_shoulder', 'left_hip', 'right_hip', 
-                     'left_knee', 'right_knee', 'left_ankle', 'right_ankle']
-        
-        for point in key_points:
-            if point in landmarks1 and point in landmarks2:
-                # Calculate Euclidean distance
-                dx = landmarks2[point]['x'] - landmarks1[point]['x']
-                dy = landmarks2[point]['y'] - landmarks1[point]['y']
-                dz = landmarks2[point]['z'] - landmarks1[point]['z']
-                
-                movement = np.sqrt(dx**2 + dy**2 + dz**2)
-                total_movement += movement
-                landmark_count += 1
-        
-        return total_movement / landmark_count if landmark_count > 0 else 0.0
+    def _calculate_motion_intensity(self, landmarks: np.ndarray, landmark_index: Dict[str, int]) -> np.ndarray:
+        """Motion intensity between each pair of consecutive frames of a landmark tensor"""
+        if len(landmarks) < 2:
+            return np.empty(0, dtype=np.float32)
+        
+        # Mean Euclidean displacement of the key body points, which every test using motion keeps
+        key_points = [landmark_index[point] for point in MOTION_KEY_POINTS]
+        steps = np.diff(landmarks[:, key_points, :3], axis=0)
+        return np.linalg.norm(steps, axis=2).mean(axis=1)
     
-    def _detect_movement_phases(self, pose_history: List[Dict]) -> List[Dict]:
-        """Detect key movement phases in the exercise"""
-        if len(pose_history) < 10:
+    def _detect_movement_phases(self, motion_intensity: np.ndarray) -> List[Dict]:
+        """Detect key movement phases in the exercise from the motion intensity series"""
+        # Needs at least 10 frames of landmarks
+        if len(motion_intensity) < 9:
             return []
         
-        phases = []
-        motion_sequence = []
-        
-        # Calculate motion sequence
-        for i in range(1, len(pose_history)):
-            motion = self._calculate_motion_intensity(pose_history[i-1], pose_history[i])
-            motion_sequence.append(motion)
-        
-        if not motion_sequence:
-            return phases
-        
-        # Find peaks and valleys in motion
-        motion_array = np.array(motion_sequence)
-        mean_motion = np.mean(motion_array)
-        std_motion = np.std(motion_array)
-        
         # Detect high activity phases
-        threshold = mean_motion + 0.5 * std_motion
-        
-        in_high_activity = False
-        phase_start = 0
-        
-        for i, motion in enumerate(motion_array):
-            if motion > threshold and not in_high_activity:
-                # Start of high activity phase
-                in_high_activity = True
-                phase_start = i
-            elif motion <= threshold and in_high_activity:
-                # End of high activity phase
-                in_high_activity = False
-                phases.append({
-                    'type': 'high_activity',
-                    'start_frame': phase_start,
-                    'end_frame': i,
-                    'duration': i - phase_start,
-                    'intensity': np.mean(motion_array[phase_start:i])
-                })
-        
-        return phases
+        threshold = np.mean(motion_intensity) + 0.5 * np.std(motion_intensity)
+        high_activity = motion_intensity > threshold
+        
+        # Run boundaries of the high-activity mask
+        edges = np.diff(high_activity.astype(np.int8), prepend=0)
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        
+        # A phase still active at the end of the video has no end frame and is not reported
+        starts = starts[:len(ends)]
+        
+        cumulative = np.concatenate([[0.0], np.cumsum(motion_intensity, dtype=np.float64)])
+        intensities = (cumulative[ends] - cumulative[starts]) / (ends - starts)
+        
+        return [
+            {
+                'type': 'high_activity',
+                'start_frame': int(start),
+                'end_frame': int(end),
+                'duration': int(end - start),
+                'intensity': float(intensity)
+            }
+            for start, end, intensity in zip(starts, ends, intensities)
+        ]
     
     def extract_movement_metrics(self, video_path: str, test_type: str) -> Dict:
         """Extract test-specific movement metrics"""
-        analysis = self.analyze_video(video_path)
-        
-        if test_type == "Vertical Jump":
-            return self._analyze_vertical_jump(analysis)
-        elif test_type == "Sit-ups (1 minute)":
-            return self._analyze_situps(analysis)
-        elif test_type == "50m Sprint":
-            return self._analyze_sprint(analysis)
-        elif test_type == "Push-ups":
-            return self._analyze_pushups(analysis)
-        elif test_type == "Flexibility Test":
-            return self._analyze_flexibility(analysis)
-        else:
+        analysis = self.analyze_video(video_path, test_type)
+        
+        return self.compute_movement_metrics(analysis, test_type)
+    
+    @classmethod
+    def compute_movement_metrics(cls, analysis: Dict, test_type: str) -> Dict:
+        """Compute test-specific movement metrics from an existing video analysis (needs no pose models)"""
+        spec = get_test_spec(test_type)
+        if spec is None:
             return {'error': f'Unknown test type: {test_type}'}
+        
+        return getattr(cls, f"_analyze_{spec['handler']}")(analysis, spec)
     
-    def _analyze_vertical_jump(self, analysis: Dict) -> Dict:
+    @classmethod
+    def _analyze_vertical_jump(cls, analysis: Dict, spec: Dict) -> Dict:
         """Analyze vertical jump performance"""
-        pose_detections = analysis.get('pose_detections', [])
-        
-        if not pose_detections:
+        if not len(analysis.get('landmarks', [])):
             return {'error': 'No pose detections found'}
         
-        # Track hip height over time
-        hip_heights = []
-        for detection in pose_detections:
-            if 'left_hip' in detection and 'right_hip' in detection:
-                # Average of left and right hip y-coordinates (lower y = higher position)
-                avg_hip_y = (detection['left_hip']['y'] + detection['right_hip']['y']) / 2
-                hip_heights.append(1.0 - avg_hip_y)  # Invert so higher values = higher jump
-        
-        if not hip_heights:
-            return {'error': 'Could not track hip movement'}
+        # Track hip height over time (higher values = higher jump)
+        hip_heights = get_signal_bank(analysis)['hip_height']
         
         # Find the jump metrics
-        baseline_height = np.mean(hip_heights[:10]) if len(hip_heights) >= 10 else hip_heights[0]
-        max_height = max(hip_heights)
+        baseline_height = float(np.mean(hip_heights[:10]) if len(hip_heights) >= 10 else hip_heights[0])
+        peak_index = int(np.argmax(hip_heights))
+        max_height = float(hip_heights[peak_index])
         jump_height = max_height - baseline_height
         
-        # Detect takeoff and landing phases
-        takeoff_frame = 0
-        landing_frame = len(hip_heights) - 1
-        
-        for i, height in enumerate(hip_heights):
-            if height > baseline_height + (jump_height * 0.1):  # 10% of jump height
-                takeoff_frame = i
-                break
+        # Detect takeoff and landing phases (10% of jump height above baseline)
+        airborne = np.flatnonzero(hip_heights > baseline_height + (jump_height * 0.1))
+        takeoff_index = airborne[0] if len(airborne) else 0
+        landing_index = airborne[-1] if len(airborne) else len(hip_heights) - 1
         
-        for i in range(len(hip_heights) - 1, -1, -1):
-            if hip_heights[i] > baseline_height + (jump_height * 0.1):
-                landing_frame = i
-                break
+        # Use native frame numbers so flight time stays correct across detection gaps
+        pose_frames = analysis['pose_frames']
+        takeoff_frame = int(pose_frames[takeoff_index])
+        landing_frame = int(pose_frames[landing_index])
         
-        flight_time = (landing_frame - takeoff_frame) / analysis.get('fps', 30)
+        flight_time = (landing_frame - takeoff_frame) / (analysis.get('fps') or 30)
         
         return {
             'jump_height_normalized': jump_height,
             'flight_time_seconds': max(flight_time, 0),
             'takeoff_frame': takeoff_frame,
             'landing_frame': landing_frame,
+            'peak_frame': int(pose_frames[peak_index]),
             'baseline_height': baseline_height,
             'max_height': max_height,
             'total_frames': len(hip_heights)
         }
     
-    def _analyze_situps(self, analysis: Dict) -> Dict:
+    @classmethod
+    def _analyze_situps(cls, analysis: Dict, spec: Dict) -> Dict:
         """Analyze sit-ups performance"""
-        pose_detections = analysis.get('pose_detections', [])
-        
-        if not pose_detections:
+        if not len(analysis.get('landmarks', [])):
             return {'error': 'No pose detections found'}
         
-        # Track torso angle over time
-        torso_angles = []
-        rep_count = 0
-        in_up_position = False
-        
-        for detection in pose_detections:
-            if all(point in detection for point in ['left_shoulder', 'left_hip', 'left_knee']):
-                # Calculate angle between shoulder-hip and hip-knee vectors
-                shoulder = detection['left_shoulder']
-                hip = detection['left_hip']
-                knee = detection['left_knee']
-                
-                # Vector from hip to shoulder
-                vec1 = np.array([shoulder['x'] - hip['x'], shoulder['y'] - hip['y']])
-                # Vector from hip to knee  
-                vec2 = np.array([knee['x'] - hip['x'], knee['y'] - hip['y']])
-                
-                # Calculate angle
-                cos_angle = np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
-                angle = np.arccos(np.clip(cos_angle, -1, 1)) * 180 / np.pi
-                torso_angles.append(angle)
-                
-                # Count reps based on angle thresholds
-                if angle < 60 and not in_up_position:  # Sitting up
-                    in_up_position = True
-                elif angle > 90 and in_up_position:  # Lying down
-                    in_up_position = False
-                    rep_count += 1
+        # Torso angle between shoulder-hip and hip-knee vectors
+        angle_signal, enter_below, exit_above = spec['rep_angle']
+        torso_angles = get_signal_bank(analysis)[angle_signal]
+        
+        # Reps: sitting up below 60 degrees, lying down again above 90
+        reps = cls._rep_timings(analysis, torso_angles, enter_below, exit_above)
+        rep_count = len(reps)
         
         # Calculate average cadence
         duration = analysis.get('duration', 1)
@@ -353,32 +1542,61 @@ class VideoAnalyzer:
         
         return {
             'rep_count': rep_count,
+            'reps': reps,
             'cadence_per_minute': cadence,
             'duration_seconds': duration,
-            'average_angle': np.mean(torso_angles) if torso_angles else 0,
-            'angle_range': max(torso_angles) - min(torso_angles) if torso_angles else 0
+            'average_angle': float(np.nanmean(torso_angles)) if len(torso_angles) else 0,
+            'angle_range': float(np.nanmax(torso_angles) - np.nanmin(torso_angles)) if len(torso_angles) else 0
         }
     
-    def _analyze_sprint(self, analysis: Dict) -> Dict:
+    @classmethod
+    def _rep_timings(cls, analysis: Dict, angles: np.ndarray,
+                     enter_below: float, exit_above: float) -> List[Dict]:
+        """Detect reps in an angle series and report their native frames, times and depth"""
+        reps = detect_reps(angles, enter_below, exit_above)
+        fps = analysis.get('fps') or 30
+        
+        start_frames = analysis['pose_frames'][reps['start']]
+        end_frames = analysis['pose_frames'][reps['end']]
+        
+        return [
+            {
+                'start_frame': int(start),
+                'end_frame': int(end),
+                'start_time': start / fps,
+                'end_time': end / fps,
+                'duration': (end - start) / fps,
+                'depth_angle': float(depth)
+            }
+            for start, end, depth in zip(start_frames, end_frames, reps['depth'])
+        ]
+    
+    @classmethod
+    def _analyze_sprint(cls, analysis: Dict, spec: Dict) -> Dict:
         """Analyze sprint performance"""
-        pose_detections = analysis.get('pose_detections', [])
-        
-        if not pose_detections:
+        if not len(analysis.get('landmarks', [])):
             return {'error': 'No pose detections found'}
         
         # Track horizontal movement (assuming camera is stationary)
-        positions = []
-        for detection in pose_detections:
-            if 'left_hip' in detection and 'right_hip' in detection:
-                # Average hip position as center of mass proxy
-                avg_x = (detection['left_hip']['x'] + detection['right_hip']['x']) / 2
-                positions.append(avg_x)
+        # Average hip position as center of mass proxy
+        positions = get_signal_bank(analysis)['hip_x']
         
         if len(positions) < 10:
             return {'error': 'Insufficient movement data'}
         
         # Calculate movement metrics
-        total_displacement = abs(positions[-1] - positions[0])
+        total_displacement = float(abs(positions[-1] - positions[0]))
+        
+        # Start: the hips first leave their starting position; finish: they first reach
+        # their final position (both within 5% of the distance covered)
+        tolerance = 0.05 * total_displacement
+        started = np.flatnonzero(np.abs(positions - positions[0]) > tolerance)
+        start_index = started[0] if len(started) else 0
+        finished = np.flatnonzero(np.abs(positions[start_index:] - positions[-1]) <= tolerance)
+        finish_index = start_index + finished[0] if len(finished) else len(positions) - 1
+        
+        start_frame = int(analysis['pose_frames'][start_index])
+        finish_frame = int(analysis['pose_frames'][finish_index])
         
         # Estimate speed (normalized units per second)
         duration = analysis.get('duration', 1)
@@ -386,7 +1604,7 @@ class VideoAnalyzer:
         
         # Calculate stride frequency
         motion_intensity = analysis.get('motion_intensity', [])
-        if motion_intensity:
+        if len(motion_intensity):
             avg_intensity = np.mean(motion_intensity)
             stride_frequency = avg_intensity * 30  # Approximate conversion
         else:
@@ -396,43 +1614,26 @@ class VideoAnalyzer:
             'estimated_speed': estimated_speed,
             'total_displacement': total_displacement,
             'duration_seconds': duration,
+            'start_frame': start_frame,
+            'finish_frame': finish_frame,
+            'sprint_time_seconds': (finish_frame - start_frame) / (analysis.get('fps') or 30),
             'stride_frequency': stride_frequency,
-            'movement_consistency': 1.0 - np.std(positions) if len(positions) > 1 else 1.0
+            'movement_consistency': 1.0 - float(np.std(positions)) if len(positions) > 1 else 1.0
         }
     
-    def _analyze_pushups(self, analysis: Dict) -> Dict:
+    @classmethod
+    def _analyze_pushups(cls, analysis: Dict, spec: Dict) -> Dict:
         """Analyze push-ups performance"""
-        pose_detections = analysis.get('pose_detections', [])
-        
-        if not pose_detections:
+        if not len(analysis.get('landmarks', [])):
             return {'error': 'No pose detections found'}
         
-        # Track elbow angles and body alignment
-        rep_count = 0
-        in_down_position = False
-        elbow_angles = []
-        
-        for detection in pose_detections:
-            if all(point in detection for point in ['left_shoulder', 'left_elbow', 'left_wrist']):
-                # Calculate elbow angle
-                shoulder = detection['left_shoulder']
-                elbow = detection['left_elbow']
-                wrist = detection['left_wrist']
-                
-                # Vectors for angle calculation
-                vec1 = np.array([shoulder['x'] - elbow['x'], shoulder['y'] - elbow['y']])
-                vec2 = np.array([wrist['x'] - elbow['x'], wrist['y'] - elbow['y']])
-                
-                cos_angle = np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
-                angle = np.arccos(np.clip(cos_angle, -1, 1)) * 180 / np.pi
-                elbow_angles.append(angle)
-                
-                # Count reps based on elbow angle
-                if angle < 90 and not in_down_position:  # Arms bent (down position)
-                    in_down_position = True
-                elif angle > 150 and in_down_position:  # Arms extended (up position)
-                    in_down_position = False
-                    rep_count += 1
+        # Track elbow angles
+        angle_signal, enter_below, exit_above = spec['rep_angle']
+        elbow_angles = get_signal_bank(analysis)[angle_signal]
+        
+        # Reps: arms bent below 90 degrees (down), extended above 150 (up)
+        reps = cls._rep_timings(analysis, elbow_angles, enter_below, exit_above)
+        rep_count = len(reps)
         
         # Calculate metrics
         duration = analysis.get('duration', 1)
@@ -440,43 +1641,30 @@ class VideoAnalyzer:
         
         return {
             'rep_count': rep_count,
+            'reps': reps,
             'cadence_per_minute': cadence,
             'duration_seconds': duration,
-            'average_elbow_angle': np.mean(elbow_angles) if elbow_angles else 0,
-            'angle_range': max(elbow_angles) - min(elbow_angles) if elbow_angles else 0
+            'average_elbow_angle': float(np.nanmean(elbow_angles)) if len(elbow_angles) else 0,
+            'angle_range': float(np.nanmax(elbow_angles) - np.nanmin(elbow_angles)) if len(elbow_angles) else 0
         }
     
-    def _analyze_flexibility(self, analysis: Dict) -> Dict:
+    @classmethod
+    def _analyze_flexibility(cls, analysis: Dict, spec: Dict) -> Dict:
         """Analyze flexibility test performance"""
-        pose_detections = analysis.get('pose_detections', [])
-        
-        if not pose_detections:
+        if not len(analysis.get('landmarks', [])):
             return {'error': 'No pose detections found'}
         
-        # Track forward reach distance
-        reach_distances = []
-        
-        for detection in pose_detections:
-            if all(point in detection for point in ['left_wrist', 'right_wrist', 'left_hip', 'right_hip']):
-                # Calculate average wrist position
-                avg_wrist_x = (detection['left_wrist']['x'] + detection['right_wrist']['x']) / 2
-                avg_hip_x = (detection['left_hip']['x'] + detection['right_hip']['x']) / 2
-                
-                # Forward reach distance (relative to hip position)
-                reach_distance = avg_wrist_x - avg_hip_x
-                reach_distances.append(reach_distance)
-        
-        if not reach_distances:
-            return {'error': 'Could not track reach movement'}
+        # Forward reach distance: average wrist position relative to hip position
+        reach_distances = get_signal_bank(analysis)['wrist_reach']
         
         # Find maximum reach
-        max_reach = max(reach_distances)
-        min_reach = min(reach_distances)
+        max_reach = float(np.max(reach_distances))
+        min_reach = float(np.min(reach_distances))
         flexibility_range = max_reach - min_reach
         
         return {
             'max_reach_distance': max_reach,
             'flexibility_range': flexibility_range,
-            'reach_consistency': 1.0 - np.std(reach_distances) if len(reach_distances) > 1 else 1.0,
-            'final_reach': reach_distances[-1] if reach_distances else 0
-        }
+            'reach_consistency': 1.0 - float(np.std(reach_distances)) if len(reach_distances) > 1 else 1.0,
+            'final_reach': float(reach_distances[-1])
+        }
\ No newline at end of file
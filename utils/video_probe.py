@@ -0,0 +1,164 @@
+import cv2
+import numpy as np
+from typing import Dict, Optional
+import logging
+from assets.sample_videos import sample_video_manager
+
+class VideoProbe:
+    """Pre-flight check of an upload using container metadata and a few sampled frames"""
+    
+    def __init__(self, sample_count: int = 5, thumbnail_long_side: int = 320):
+        # Frames spread evenly across the clip for the brightness/blur checks
+        self.sample_count = sample_count
+        self.thumbnail_long_side = thumbnail_long_side
+        
+        # Hard limits: clips outside these are rejected before pose inference
+        self.hard_limits = {
+            'min_duration': 1.0,        # Seconds
+            'max_duration': 300.0,      # Seconds
+            'min_fps': 10.0,
+            'min_short_side': 240,      # Pixels
+            'min_brightness': 15.0,     # Mean grey level of the brightest sampled frame
+        }
+        
+        # Soft limits: clips outside these are analysed with a warning
+        self.soft_limits = {
+            'max_brightness': 235.0,    # Mean grey level of the darkest sampled frame
+            'min_sharpness': 20.0,      # Median Laplacian variance of the sampled frames
+        }
+    
+    def probe(self, video_path: str, test_type: Optional[str] = None) -> Dict:
+        """
+        Check whether a video is usable for the given test
+        
+        Args:
+            video_path: Path to the video file
+            test_type: Type of fitness test, for test-specific duration and resolution rules
+        
+        Returns:
+            Dictionary with 'passed', container 'metadata', 'errors' and 'warnings'
+        """
+        result = {
+            'passed': True,
+            'metadata': {},
+            'errors': [],
+            'warnings': []
+        }
+        
+        cap = cv2.VideoCapture(video_path)
+        
+        try:
+            if not cap.isOpened():
+                result['passed'] = False
+                result['errors'].append('Unable to open video file')
+                return result
+            
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            
+            result['metadata'] = {
+                'fps': fps,
+                'frame_count': frame_count,
+                'duration': frame_count / fps if fps > 0 and frame_count > 0 else 0,
+                'resolution': f"{width}x{height}"
+            }
+            
+            self._check_container(result)
+            self._check_frames(cap, frame_count, result)
+        
+        except Exception as e:
+            logging.error(f"Video probe failed: {str(e)}")
+            result['warnings'].append('Video could not be fully checked before analysis')
+        
+        finally:
+            cap.release()
+        
+        # Test-specific requirements from the recording guidelines
+        if test_type and result['passed'] and result['metadata']['duration'] > 0:
+            validation = sample_video_manager.validate_video_requirements(result['metadata'], test_type)
+            messages = result['warnings'] if validation['overall_pass'] else result['errors']
+            messages.extend(check['message'] for check in validation['checks'].values() if not check['pass'])
+            result['passed'] = validation['overall_pass']
+        
+        return result
+    
+    def _check_container(self, result: Dict):
+        """Apply the hard limits to the container metadata"""
+        metadata = result['metadata']
+        limits = self.hard_limits
+        width, height = map(int, metadata['resolution'].split('x'))
+        
+        if metadata['fps'] > 0 and metadata['fps'] < limits['min_fps']:
+            result['errors'].append(f"Frame rate too low ({metadata['fps']:.0f} fps)")
+        
+        if min(width, height) < limits['min_short_side']:
+            result['errors'].append(f"Resolution too low ({metadata['resolution']})")
+        
+        # Some containers do not report a frame count; the full analysis measures it instead
+        if metadata['duration'] > 0:
+            if metadata['duration'] < limits['min_duration']:
+                result['errors'].append(f"Video too short ({metadata['duration']:.1f}s)")
+            elif metadata['duration'] > limits['max_duration']:
+                result['errors'].append(f"Video too long ({metadata['duration']:.0f}s)")
+        else:
+            result['warnings'].append('Video length could not be determined from the file')
+        
+        if result['errors']:
+            result['passed'] = False
+    
+    def _check_frames(self, cap: cv2.VideoCapture, frame_count: int, result: Dict):
+        """Measure brightness and sharpness on a handful of frames spread across the clip"""
+        if not result['passed']:
+            return
+        
+        positions = (np.linspace(0, frame_count - 1, self.sample_count).astype(int)
+                     if frame_count > 0 else [None] * self.sample_count)
+        brightness = []
+        sharpness = []
+        
+        for position in positions:
+            if position is not None:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, int(position))
+            ret, frame = cap.read()
+            if not ret:
+                continue
+            
+            gray = cv2.cvtColor(self._thumbnail(frame), cv2.COLOR_BGR2GRAY)
+            brightness.append(float(np.mean(gray)))
+            sharpness.append(float(cv2.Laplacian(gray, cv2.CV_64F).var()))
+        
+        if not brightness:
+            result['passed'] = False
+            result['errors'].append('No frames could be decoded from the video')
+            return
+        
+        result['metadata']['brightness'] = float(np.mean(brightness))
+        result['metadata']['sharpness'] = float(np.median(sharpness))
+        
+        if max(brightness) < self.hard_limits['min_brightness']:
+            result['passed'] = False
+            result['errors'].append('Video is too dark to analyse')
+        elif min(brightness) > self.soft_limits['max_brightness']:
+            result['warnings'].append('Video appears overexposed')
+        
+        if result['metadata']['sharpness'] < self.soft_limits['min_sharpness']:
+            result['warnings'].append('Video appears blurry; pose detection may be unreliable')
+    
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        """Downscale a frame so its longer side is at most ``thumbnail_long_side`` pixels"""
+        height, width = frame.shape[:2]
+        if max(height, width) <= self.thumbnail_long_side:
+            return frame
+        
+        scale = self.thumbnail_long_side / max(height, width)
+        size = (max(int(round(width * scale)), 1), max(int(round(height * scale)), 1))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+# Global instance for easy access
+video_probe = VideoProbe()
+
+def probe_video(video_path: str, test_type: Optional[str] = None) -> Dict:
+    """Pre-flight check of a video before analysis"""
+    return video_probe.probe(video_path, test_type)
@@ -0,0 +1,138 @@
+import cv2
+import glob
+import hashlib
+import logging
+import os
+import tempfile
+from typing import Optional
+import numpy as np
+
+# Analysis proxy format: uploads are transcoded once to this size and constant frame rate
+PROXY_LONG_SIDE = 640
+PROXY_FPS = 30.0
+
+# Proxies live in their own directory so directories of source videos (batch
+# re-analysis input) never contain proxies
+DEFAULT_PROXY_DIR = "data/proxy_cache"
+
+def _proxy_stem(video_path: str, proxy_dir: str) -> str:
+    """Proxy path prefix for a video: its name plus a digest of its absolute path"""
+    name = os.path.splitext(os.path.basename(video_path))[0]
+    digest = hashlib.sha256(os.path.abspath(video_path).encode()).hexdigest()[:12]
+    return os.path.join(proxy_dir, f"{name}-{digest}")
+
+def proxy_path_for(video_path: str, long_side: int = PROXY_LONG_SIDE, fps: float = PROXY_FPS,
+                   proxy_dir: str = DEFAULT_PROXY_DIR) -> str:
+    """Path of a video's analysis proxy in the proxy directory"""
+    return f"{_proxy_stem(video_path, proxy_dir)}.proxy-{long_side}p{fps:g}.mp4"
+
+def remove_proxy_videos(video_path: str, proxy_dir: str = DEFAULT_PROXY_DIR):
+    """Delete every analysis proxy of a video"""
+    for path in glob.glob(f"{glob.escape(_proxy_stem(video_path, proxy_dir))}.proxy-*.mp4"):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def find_proxy_video(video_path: str, long_side: int = PROXY_LONG_SIDE, fps: float = PROXY_FPS,
+                     proxy_dir: str = DEFAULT_PROXY_DIR) -> Optional[str]:
+    """Path of a video's proxy if one was already written and is newer than the video, else None"""
+    proxy_path = proxy_path_for(video_path, long_side, fps, proxy_dir)
+    if os.path.exists(proxy_path) and os.path.getmtime(proxy_path) >= os.path.getmtime(video_path):
+        return proxy_path
+    return None
+
+def create_proxy_video(video_path: str, long_side: int = PROXY_LONG_SIDE,
+                       fps: float = PROXY_FPS, proxy_dir: str = DEFAULT_PROXY_DIR) -> Optional[str]:
+    """
+    Transcode a video into a fixed-size, constant-frame-rate analysis proxy
+    
+    Frames are resampled on their timestamps, so variable-frame-rate phone clips
+    come out at exactly ``fps``; frames are downscaled (never upscaled) so the
+    longer side is at most ``long_side``. An up-to-date proxy is reused.
+    
+    Returns:
+        Path of the proxy, or None if the video could not be transcoded
+    """
+    proxy_path = find_proxy_video(video_path, long_side, fps, proxy_dir)
+    if proxy_path is not None:
+        return proxy_path
+    
+    proxy_path = proxy_path_for(video_path, long_side, fps, proxy_dir)
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return None
+    
+    os.makedirs(proxy_dir, exist_ok=True)
+    
+    source_fps = cap.get(cv2.CAP_PROP_FPS)
+    source_interval = 1000.0 / source_fps if source_fps > 0 else 1000.0 / fps
+    tick_interval = 1000.0 / fps
+    
+    # Write to a temporary file first so readers never see a partial proxy
+    fd, temp_path = tempfile.mkstemp(dir=proxy_dir, suffix='.mp4')
+    os.close(fd)
+    writer = None
+    frames_written = 0
+    
+    try:
+        previous_frame = None
+        previous_time = None
+        first_time = None
+        
+        while True:
+            ret, frame = cap.read()
+            
+            if ret:
+                timestamp = cap.get(cv2.CAP_PROP_POS_MSEC)
+                # Some containers report no or non-increasing timestamps
+                if previous_time is not None and timestamp <= previous_time:
+                    timestamp = previous_time + source_interval
+            else:
+                timestamp = (previous_time or 0.0) + source_interval
+            
+            # Repeat or drop source frames so one is written per output tick; the
+            # tolerance keeps rounded container timestamps from adding a tick
+            if previous_frame is not None:
+                while first_time + frames_written * tick_interval < timestamp - 0.5:
+                    writer.write(previous_frame)
+                    frames_written += 1
+            
+            if not ret:
+                break
+            
+            previous_frame = _resize_for_proxy(frame, long_side)
+            previous_time = timestamp
+            
+            if writer is None:
+                height, width = previous_frame.shape[:2]
+                writer = cv2.VideoWriter(temp_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+                if not writer.isOpened():
+                    raise Exception("Unable to open proxy video writer")
+                first_time = timestamp
+    
+    except Exception as e:
+        logging.error(f"Proxy transcoding failed for {video_path}: {str(e)}")
+        frames_written = 0
+    
+    finally:
+        cap.release()
+        if writer is not None:
+            writer.release()
+    
+    if frames_written == 0:
+        os.remove(temp_path)
+        return None
+    
+    os.replace(temp_path, proxy_path)
+    return proxy_path
+
+def _resize_for_proxy(frame: np.ndarray, long_side: int) -> np.ndarray:
+    """Downscale so the longer side is at most ``long_side``, keeping even dimensions for the encoder"""
+    height, width = frame.shape[:2]
+    scale = min(long_side / max(height, width), 1.0)
+    size = (max(int(width * scale) // 2 * 2, 2), max(int(height * scale) // 2 * 2, 2))
+    
+    if size == (width, height):
+        return frame
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)